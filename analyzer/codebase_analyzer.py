@@ -10,6 +10,7 @@ import os
 import re
 import ast
 import json
+import sys
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Set, Tuple
 from dataclasses import dataclass
@@ -20,6 +21,13 @@ from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Interned risk-level sentinels: every risk_assessment value is the same
+# object, so downstream equality checks and dict/Counter lookups resolve
+# by identity instead of character-by-character compare
+RISK_HIGH = sys.intern('HIGH')
+RISK_MEDIUM = sys.intern('MEDIUM')
+RISK_LOW = sys.intern('LOW')
+
 
 @dataclass
 class CodeContext:
@@ -428,21 +436,21 @@ class CodebaseAnalyzer:
         # Assess risk level for each file
         for file_path, count in file_risks.items():
             if count > 5:
-                risk_level = 'HIGH'
+                risk_level = RISK_HIGH
             elif count > 2:
-                risk_level = 'MEDIUM'
+                risk_level = RISK_MEDIUM
             else:
-                risk_level = 'LOW'
-            
+                risk_level = RISK_LOW
+
             risk_assessment[file_path] = risk_level
-        
+
         # Overall risk assessment
         if len(error_contexts) > 10:
-            risk_assessment['overall'] = 'HIGH'
+            risk_assessment['overall'] = RISK_HIGH
         elif len(error_contexts) > 5:
-            risk_assessment['overall'] = 'MEDIUM'
+            risk_assessment['overall'] = RISK_MEDIUM
         else:
-            risk_assessment['overall'] = 'LOW'
+            risk_assessment['overall'] = RISK_LOW
         
         return risk_assessment
     
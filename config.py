@@ -21,8 +21,9 @@ class LogConfig:
     poll_interval: float = 1.0
     # Maximum log entries to keep in memory
     max_entries: int = 10000
-    # Buffer size for reading log files
-    buffer_size: int = 8192
+    # Buffer size for reading log files; 64 KB keeps syscall counts low
+    # when tailing busy logs
+    buffer_size: int = 65536
     
     def __post_init__(self):
         if self.log_paths is None:
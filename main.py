@@ -60,17 +60,15 @@ class DevOpsAISystem:
             
             # Main processing loop
             while self.running:
-                # Process new log entries
-                log_entries = await self.log_watcher.get_new_entries()
-                
+                # Wait up to a second for a batch of new entries; the
+                # timeout doubles as the idle pacing of the loop
+                log_entries = await self.log_watcher.get_new_entries(timeout=1)
+
                 for entry in log_entries:
                     await self._process_log_entry(entry)
                 
-                # Sleep briefly to prevent high CPU usage
-                await asyncio.sleep(1)
-                
         except Exception as e:
-            logger.error(f"Error in main loop: {e}")
+            logger.error("Error in main loop: %s", e)
         finally:
             await self.stop()
     
@@ -91,31 +89,26 @@ class DevOpsAISystem:
             
             # Generate patches
             patches = await self.patch_generator.generate_patches(fixes)
-            
-            # Store in memory
-            await self.memory.store_incident({
-                'log_entry': log_entry,
-                'parsed_data': parsed_data,
-                'classification': classification,
-                'analysis': analysis,
-                'fixes': fixes,
-                'patches': patches
-            })
-            
-            # Generate reports
-            report = await self.report_builder.build_report({
+
+            # Store in memory and generate reports concurrently - both
+            # consume the same bundle and are independent of each other
+            bundle = {
                 'log_entry': log_entry,
                 'parsed_data': parsed_data,
                 'classification': classification,
                 'analysis': analysis,
                 'fixes': fixes,
                 'patches': patches
-            })
-            
+            }
+            report, _ = await asyncio.gather(
+                self.report_builder.build_report(bundle),
+                self.memory.store_incident(bundle)
+            )
+
             logger.info(f"Processed log entry: {report['summary']}")
             
         except Exception as e:
-            logger.error(f"Error processing log entry: {e}")
+            logger.error("Error processing log entry: %s", e)
     
     async def stop(self):
         """Stop the DevOps AI system."""
@@ -140,7 +133,7 @@ async def main():
     except KeyboardInterrupt:
         logger.info("Received keyboard interrupt, shutting down...")
     except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
         sys.exit(1)
 
 
@@ -5,6 +5,7 @@ Provides persistent storage and intelligent retrieval of error patterns.
 """
 
 import asyncio
+import hashlib
 import logging
 import json
 import os
@@ -12,10 +13,20 @@ import re
 import gzip
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from collections import defaultdict
-import traceback
+from collections import defaultdict, Counter
+from sortedcontainers import SortedList
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 from config import Config
 
@@ -35,6 +46,11 @@ class Incident:
     patches: List[Dict[str, Any]]
     resolution_status: str
     metadata: Dict[str, Any]
+    # Lowercased message cached at creation so searches don't re-lower per query
+    _msg_lower: str = field(default='', repr=False, compare=False)
+
+    def __post_init__(self):
+        self._msg_lower = self.log_entry.get('message', '').lower()
 
 
 class IncidentMemory:
@@ -49,9 +65,16 @@ class IncidentMemory:
         # In-memory cache for recent incidents
         self._incident_cache = {}
         self._cache_size = 100
-        
+
+        # Running statistics maintained incrementally on store/cleanup
+        self._error_type_counts = Counter()
+        self._severity_counts = Counter()
+        self._by_time = SortedList()  # (timestamp, incident_id) pairs
+
         # Load existing incidents
         self._incidents = self._load_incidents()
+        for incident in self._incidents.values():
+            self._register_incident(incident)
         
         # Background tasks
         self._cleanup_task = None
@@ -62,46 +85,98 @@ class IncidentMemory:
         incidents = {}
         
         try:
-            if os.path.exists(self.config.memory.storage_file):
-                with open(self.config.memory.storage_file, 'r') as f:
-                    data = json.load(f)
-                
-                for incident_data in data:
+            storage_file = self.config.memory.storage_file
+            if os.path.exists(storage_file):
+                f = open(storage_file, 'rb')
+            elif os.path.exists(storage_file + '.gz'):
+                f = gzip.open(storage_file + '.gz', 'rb')
+            else:
+                return incidents
+
+            with f:
+                if ijson is not None:
+                    # Stream incidents one at a time instead of materializing
+                    # the whole JSON document before building objects.
+                    # use_float keeps numbers as floats — ijson's default
+                    # Decimal values would break JSON serialization on the
+                    # next save
+                    items = ijson.items(f, 'item', use_float=True)
+                else:
+                    items = json.load(f)
+
+                for incident_data in items:
                     # Convert timestamp string back to datetime
                     incident_data['timestamp'] = datetime.fromisoformat(incident_data['timestamp'])
-                    
+
                     # Create incident object
                     incident = Incident(**incident_data)
                     incidents[incident.incident_id] = incident
-        
+
         except Exception as e:
-            logger.warning(f"Error loading incidents from storage: {e}")
+            logger.warning("Error loading incidents from storage: %s", e)
         
         return incidents
     
+    def _register_incident(self, incident: Incident):
+        """Update running statistics when an incident is added."""
+        self._error_type_counts[incident.classification.get('error_type', 'unknown')] += 1
+        self._severity_counts[incident.classification.get('severity', 'UNKNOWN')] += 1
+        self._by_time.add((incident.timestamp, incident.incident_id))
+
+    def _unregister_incident(self, incident: Incident):
+        """Update running statistics when an incident is removed."""
+        error_type = incident.classification.get('error_type', 'unknown')
+        self._error_type_counts[error_type] -= 1
+        if self._error_type_counts[error_type] <= 0:
+            del self._error_type_counts[error_type]
+
+        severity = incident.classification.get('severity', 'UNKNOWN')
+        self._severity_counts[severity] -= 1
+        if self._severity_counts[severity] <= 0:
+            del self._severity_counts[severity]
+
+        self._by_time.discard((incident.timestamp, incident.incident_id))
+
+    def _incident_to_json_ready(self, incident: Incident) -> Dict[str, Any]:
+        """Convert an incident to a JSON-serializable dict without copying nested data."""
+        # Unlike dataclasses.asdict, this reuses the nested dicts/lists by
+        # reference - they are only read during serialization.
+        return {
+            'incident_id': incident.incident_id,
+            'timestamp': incident.timestamp.isoformat(),
+            'log_entry': incident.log_entry,
+            'parsed_data': incident.parsed_data,
+            'classification': incident.classification,
+            'analysis': incident.analysis,
+            'fixes': incident.fixes,
+            'patches': incident.patches,
+            'resolution_status': incident.resolution_status,
+            'metadata': incident.metadata
+        }
+
     def _save_incidents(self):
         """Save incidents to storage file."""
         try:
             # Convert incidents to serializable format
-            data = []
-            for incident in self._incidents.values():
-                incident_dict = asdict(incident)
-                # Convert datetime to string
-                incident_dict['timestamp'] = incident.timestamp.isoformat()
-                data.append(incident_dict)
-            
-            # Write to file with compression if enabled
+            data = [self._incident_to_json_ready(incident) for incident in self._incidents.values()]
+
+            # Serialize once, then write with compression if enabled
+            if orjson is not None:
+                payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(data, indent=2).encode('utf-8')
+
             if self.config.memory.enable_compression:
-                with gzip.open(self.config.memory.storage_file + '.gz', 'wt') as f:
-                    json.dump(data, f, indent=2)
+                with gzip.open(self.config.memory.storage_file + '.gz', 'wb') as f:
+                    f.write(payload)
             else:
-                with open(self.config.memory.storage_file, 'w') as f:
-                    json.dump(data, f, indent=2)
+                with open(self.config.memory.storage_file, 'wb') as f:
+                    f.write(payload)
             
-            logger.debug(f"Saved {len(data)} incidents to storage")
+            logger.debug("Saved %d incidents to storage", len(data))
             
         except Exception as e:
-            logger.error(f"Error saving incidents to storage: {e}")
+            logger.error("Error saving incidents to storage: %s", e)
     
     async def store_incident(self, incident_data: Dict[str, Any]) -> str:
         """Store a new incident."""
@@ -130,12 +205,13 @@ class IncidentMemory:
             # Check for duplicates if deduplication is enabled
             if self.config.memory.enable_deduplication:
                 if self._is_duplicate_incident(incident):
-                    logger.info(f"Duplicate incident detected: {incident_id}")
+                    logger.info("Duplicate incident detected: %s", incident_id)
                     return incident_id
             
             # Store in memory
             self._incidents[incident_id] = incident
             self._add_to_cache(incident_id, incident)
+            self._register_incident(incident)
             
             # Save to storage
             self._save_incidents()
@@ -143,13 +219,12 @@ class IncidentMemory:
             # Update metadata
             incident.metadata['stored_at'] = datetime.now().isoformat()
             
-            logger.info(f"Stored incident: {incident_id}")
+            logger.info("Stored incident: %s", incident_id)
             
             return incident_id
             
         except Exception as e:
-            logger.error(f"Error storing incident: {e}")
-            logger.debug(f"Traceback: {traceback.format_exc()}")
+            logger.exception("Error storing incident")
             return ""
     
     def _generate_incident_id(self, incident_data: Dict[str, Any]) -> str:
@@ -162,7 +237,6 @@ class IncidentMemory:
             str(incident_data.get('analysis', {}).get('common_patterns', {}))
         ]
         
-        import hashlib
         hash_input = '|'.join(key_data).encode('utf-8')
         hash_digest = hashlib.md5(hash_input).hexdigest()[:8]
         
@@ -183,10 +257,7 @@ class IncidentMemory:
                 incident.classification.get('severity') == new_incident.classification.get('severity')):
                 
                 # Check message similarity
-                old_message = incident.log_entry.get('message', '').lower()
-                new_message = new_incident.log_entry.get('message', '').lower()
-                
-                if self._calculate_similarity(old_message, new_message) > 0.8:
+                if self._calculate_similarity(incident._msg_lower, new_incident._msg_lower) > 0.8:
                     return True
         
         return False
@@ -228,10 +299,20 @@ class IncidentMemory:
         
         return None
     
+    def _compile_message_pattern(self, message_query: str) -> 're.Pattern':
+        """Compile a message search into a single regex requiring all terms."""
+        terms = message_query.lower().split()
+        return re.compile(''.join(f'(?=.*{re.escape(term)})' for term in terms), re.DOTALL)
+
     async def search_incidents(self, query: Dict[str, Any]) -> List[Incident]:
         """Search for incidents matching criteria."""
         results = []
-        
+
+        # Compile the message filter once per query instead of per incident
+        if 'message' in query:
+            query = dict(query)
+            query['_message_pattern'] = self._compile_message_pattern(query['message'])
+
         for incident in self._incidents.values():
             if self._incident_matches_query(incident, query):
                 results.append(incident)
@@ -264,10 +345,11 @@ class IncidentMemory:
         
         # Message search
         if 'message' in query:
-            message = incident.log_entry.get('message', '').lower()
-            search_terms = query['message'].lower().split()
-            
-            if not all(term in message for term in search_terms):
+            pattern = query.get('_message_pattern')
+            if pattern is None:
+                pattern = self._compile_message_pattern(query['message'])
+
+            if not pattern.search(incident._msg_lower):
                 return False
         
         # Component filter
@@ -310,9 +392,7 @@ class IncidentMemory:
             similarity_scores.append(0.3)
         
         # Message similarity
-        message1 = incident1.log_entry.get('message', '').lower()
-        message2 = incident2.log_entry.get('message', '').lower()
-        message_similarity = self._calculate_similarity(message1, message2)
+        message_similarity = self._calculate_similarity(incident1._msg_lower, incident2._msg_lower)
         similarity_scores.append(message_similarity * 0.3)
         
         return sum(similarity_scores)
@@ -328,34 +408,23 @@ class IncidentMemory:
                 'recent_incidents': []
             }
         
-        # Error type distribution
-        error_types = defaultdict(int)
-        for incident in self._incidents.values():
-            error_type = incident.classification.get('error_type', 'unknown')
-            error_types[error_type] += 1
-        
-        # Severity distribution
-        severity_distribution = defaultdict(int)
-        for incident in self._incidents.values():
-            severity = incident.classification.get('severity', 'UNKNOWN')
-            severity_distribution[severity] += 1
-        
-        # Time range
-        timestamps = [incident.timestamp for incident in self._incidents.values()]
+        # All distributions are maintained incrementally, so this is O(1)
+        # apart from the top-10 slice off the sorted time index.
+        oldest_ts = self._by_time[0][0]
+        newest_ts = self._by_time[-1][0]
         time_range = {
-            'start': min(timestamps).isoformat(),
-            'end': max(timestamps).isoformat(),
-            'span_days': (max(timestamps) - min(timestamps)).days
+            'start': oldest_ts.isoformat(),
+            'end': newest_ts.isoformat(),
+            'span_days': (newest_ts - oldest_ts).days
         }
-        
-        # Recent incidents
-        recent_incidents = sorted(self._incidents.values(), key=lambda x: x.timestamp, reverse=True)[:10]
-        recent_incident_ids = [incident.incident_id for incident in recent_incidents]
-        
+
+        # Recent incidents (newest first)
+        recent_incident_ids = [incident_id for _, incident_id in self._by_time[-10:]][::-1]
+
         return {
             'total_incidents': len(self._incidents),
-            'error_types': dict(error_types),
-            'severity_distribution': dict(severity_distribution),
+            'error_types': dict(self._error_type_counts),
+            'severity_distribution': dict(self._severity_counts),
             'time_range': time_range,
             'recent_incidents': recent_incident_ids
         }
@@ -371,7 +440,7 @@ class IncidentMemory:
             # Save changes
             self._save_incidents()
             
-            logger.info(f"Updated resolution status for incident {incident_id}: {resolution_status}")
+            logger.info("Updated resolution status for incident %s: %s", incident_id, resolution_status)
     
     async def cleanup_old_incidents(self):
         """Clean up old incidents based on retention policy."""
@@ -386,6 +455,7 @@ class IncidentMemory:
                     incidents_to_remove.append(incident_id)
             
             for incident_id in incidents_to_remove:
+                self._unregister_incident(self._incidents[incident_id])
                 del self._incidents[incident_id]
                 if incident_id in self._incident_cache:
                     del self._incident_cache[incident_id]
@@ -396,7 +466,7 @@ class IncidentMemory:
                 logger.info(f"Cleaned up {removed_count} old incidents")
             
         except Exception as e:
-            logger.error(f"Error cleaning up old incidents: {e}")
+            logger.error("Error cleaning up old incidents: %s", e)
     
     async def start_background_tasks(self):
         """Start background maintenance tasks."""
@@ -419,7 +489,7 @@ class IncidentMemory:
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Error in cleanup loop: {e}")
+                logger.error("Error in cleanup loop: %s", e)
                 await asyncio.sleep(600)  # Wait 10 minutes before retrying
     
     async def _deduplication_loop(self):
@@ -431,7 +501,7 @@ class IncidentMemory:
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Error in deduplication loop: {e}")
+                logger.error("Error in deduplication loop: %s", e)
                 await asyncio.sleep(1800)
     
     async def _perform_deduplication(self):
@@ -464,13 +534,13 @@ class IncidentMemory:
                     if similarity > 0.8:  # High similarity threshold
                         current.resolution_status = 'duplicate'
                         current.metadata['duplicate_of'] = previous.incident_id
-                        logger.info(f"Marked incident {current.incident_id} as duplicate of {previous.incident_id}")
+                        logger.info("Marked incident %s as duplicate of %s", current.incident_id, previous.incident_id)
             
             # Save changes
             self._save_incidents()
             
         except Exception as e:
-            logger.error(f"Error performing deduplication: {e}")
+            logger.error("Error performing deduplication: %s", e)
     
     def get_memory_stats(self) -> Dict[str, Any]:
         """Get statistics about the incident memory."""
@@ -493,5 +563,8 @@ class IncidentMemory:
         """Clear all stored incidents."""
         self._incidents.clear()
         self._incident_cache.clear()
+        self._error_type_counts.clear()
+        self._severity_counts.clear()
+        self._by_time.clear()
         self._save_incidents()
         logger.info("Cleared all incidents")
\ No newline at end of file
@@ -4,12 +4,77 @@ Log parsing patterns and utilities.
 Contains regex patterns and parsing rules for different log formats.
 """
 
+import functools
 import re
-from typing import Dict, List, Pattern, Tuple, Any
+from typing import Dict, List, Optional, Pattern, Tuple, Any
 from dataclasses import dataclass
 import json
 import datetime
 
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import ciso8601
+except ImportError:
+    ciso8601 = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+# Probe-dispatched timestamp formats: each probe selects exactly one strptime
+# format, replacing the try-every-format cascade with a single parse attempt.
+# ISO 8601 variants are handled first by the C-level fast parsers.
+_TS_DISPATCH = (
+    (re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d+\Z'), '%Y-%m-%d %H:%M:%S,%f'),
+    (re.compile(r'\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2},\d+\Z'), '%Y/%m/%d %H:%M:%S,%f'),
+    (re.compile(r'\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}\Z'), '%Y/%m/%d %H:%M:%S'),
+    (re.compile(r'[A-Za-z]{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2}\Z'), '%b %d %H:%M:%S'),
+    (re.compile(r'[A-Za-z]{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2} \d{4}\Z'), '%b %d %H:%M:%S %Y'),
+    (re.compile(r'\d{2}/[A-Za-z]{3}/\d{4}:\d{2}:\d{2}:\d{2} [+-]\d{4}\Z'), '%d/%b/%Y:%H:%M:%S %z'),
+    (re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d+Z\Z'), '%Y-%m-%dT%H:%M:%S.%fZ'),
+    (re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z\Z'), '%Y-%m-%dT%H:%M:%SZ')
+)
+
+
+# Compiled once at import: relying on re's internal cache still costs a dict
+# lookup per call, and the cache is capped at 512 entries
+_JSON_SCAN = re.compile(r'(\{.*\})')
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_timestamp(timestamp_str: str) -> Optional[datetime.datetime]:
+    """Parse a log timestamp string to a datetime, or None if unparseable.
+
+    Timestamps repeat heavily within a file (many lines per second), so
+    results are memoized.
+    """
+    if ciso8601 is not None:
+        try:
+            return ciso8601.parse_datetime(timestamp_str)
+        except ValueError:
+            pass
+
+    try:
+        return datetime.datetime.fromisoformat(timestamp_str)
+    except ValueError:
+        pass
+
+    for probe, fmt in _TS_DISPATCH:
+        if probe.match(timestamp_str):
+            try:
+                return datetime.datetime.strptime(timestamp_str, fmt)
+            except ValueError:
+                return None
+
+    return None
+
 
 @dataclass
 class ParsePattern:
@@ -23,10 +88,11 @@ class ParsePattern:
 
 class LogPatterns:
     """Collection of log parsing patterns for different formats."""
-    
+
     def __init__(self):
         self.patterns = self._initialize_patterns()
-    
+        self._build_dispatch()
+
     def _initialize_patterns(self) -> List[ParsePattern]:
         """Initialize all log parsing patterns."""
         patterns = []
@@ -136,28 +202,234 @@ class LogPatterns:
         
         # Sort by priority (higher priority first)
         patterns.sort(key=lambda p: p.priority, reverse=True)
-        
+
+        # Patterns ending in a greedy catch-all already consume to end of
+        # line; making that explicit ([^\n]* is deterministic, \Z lets the
+        # engine finish without backtracking setup) changes no match results.
+        # Prefix formats like the Apache patterns tolerate trailing content
+        # by design and stay un-anchored.
+        for parse_pattern in patterns:
+            source = parse_pattern.pattern.pattern
+            if source.endswith('(.*)'):
+                parse_pattern.pattern = re.compile(source[:-4] + r'([^\n]*)\Z')
+
         return patterns
-    
+
+    def _build_dispatch(self):
+        """Combine the pattern bank into per-bucket alternations.
+
+        Patterns are bucketed by leading character class (digit-anchored
+        formats vs everything else) and each bucket is compiled into a single
+        alternation, so matching a line costs one or two regex invocations
+        instead of one per pattern. Priority order is preserved within the
+        alternation (leftmost alternative wins at the anchor position).
+        """
+        # SoA views of the pattern bank: the match loop touches only
+        # _compiled, and extraction indexes _fields/_names, instead of
+        # chasing ParsePattern attributes per line. self.patterns stays the
+        # canonical list for metadata (priority, description).
+        self._compiled = tuple(p.pattern for p in self.patterns)
+        self._fields = tuple(tuple(p.fields) for p in self.patterns)
+        self._names = tuple(p.name for p in self.patterns)
+
+        digit_bucket = []
+        general_bucket = []
+        for index, parse_pattern in enumerate(self.patterns):
+            source = parse_pattern.pattern.pattern
+            if source.startswith(r'(\d'):
+                digit_bucket.append((index, parse_pattern))
+            else:
+                general_bucket.append((index, parse_pattern))
+
+        try:
+            self._digit_dispatch = self._compile_bucket(digit_bucket)
+            self._general_dispatch = self._compile_bucket(general_bucket)
+        except re.error:
+            # A pattern that can't be combined (e.g. conflicting group names)
+            # falls back to the sequential per-pattern loop
+            self._digit_dispatch = None
+            self._general_dispatch = None
+
+        self._hs_db = self._build_hyperscan()
+        self._build_extractors()
+
+    def _build_extractors(self):
+        """Generate a specialized field extractor per pattern.
+
+        Each extractor is exec-compiled straight-line code with the field
+        names and group offsets inlined, replacing the generic
+        enumerate-over-fields loop on the per-line hot path.
+        """
+        extractors = []
+        for index, compiled in enumerate(self._compiled):
+            fields = self._fields[index]
+            count = min(len(fields), compiled.groups)
+            lines = ['def _extract(match, base):', '    result = {}']
+            for i, field_name in enumerate(fields[:count]):
+                lines.append(f'    value = match.group(base + {i + 1})')
+                lines.append('    if value:')
+                lines.append(f'        result[{field_name!r}] = value.strip()')
+            lines.append('    return result')
+
+            namespace = {}
+            try:
+                exec('\n'.join(lines), namespace)
+            except SyntaxError:
+                # Unusual field name - the generic loop handles it
+                extractors.append(None)
+                continue
+            extractors.append(namespace['_extract'])
+
+        # Frozen like _compiled/_fields/_names: the hot-path structures are
+        # immutable so batch-parse worker threads can share them safely;
+        # priority/description metadata lives only on self.patterns
+        self._extractors = tuple(extractors)
+
+    def _build_hyperscan(self):
+        """Compile the pattern bank into a Hyperscan database if available.
+
+        Hyperscan matches all patterns in a single SIMD pass; the winning
+        pattern's Python regex is then re-run once for group capture. Returns
+        None when the module is missing or a pattern is unsupported, in which
+        case the combined-alternation dispatch is used instead.
+        """
+        if hyperscan is None:
+            return None
+
+        try:
+            db = hyperscan.Database()
+            # Anchor at line start to mirror re.match semantics
+            expressions = [
+                ('^(?:%s)' % parse_pattern.pattern.pattern).encode('utf-8')
+                for parse_pattern in self.patterns
+            ]
+            ids = list(range(len(expressions)))
+            db.compile(expressions=expressions, ids=ids, elements=len(expressions))
+            return db
+        except Exception:
+            # Unsupported construct (lookaround, group names, ...) - fall back
+            return None
+
+    def _compile_bucket(self, bucket: List[Tuple[int, ParsePattern]]):
+        """Compile one bucket into (combined_regex, route_table)."""
+        if not bucket:
+            return None
+
+        parts = []
+        routes = {}
+        group_count = 0
+        for index, parse_pattern in bucket:
+            group_name = f'p{index}'
+            # Outer named group number; the pattern's own groups follow it
+            routes[group_name] = (index, group_count + 1)
+            parts.append(f'(?P<{group_name}>{parse_pattern.pattern.pattern})')
+            group_count += 1 + parse_pattern.pattern.groups
+
+        return re.compile('|'.join(parts)), routes
+
+    def match_line(self, line: str) -> Optional[Tuple[int, 're.Match', int]]:
+        """Match a line against the pattern bank.
+
+        Returns (index, match, outer_group) where index selects into the
+        parallel _compiled/_fields/_names arrays and outer_group is the group
+        number of the matched pattern's enclosing group in the combined regex
+        (0 when the pattern was matched standalone), or None if nothing matched.
+        """
+        if self._hs_db is not None:
+            hit = self._match_hyperscan(line)
+            if hit is not NotImplemented:
+                return hit
+
+        if self._digit_dispatch is None and self._general_dispatch is None:
+            # Fallback path when the combined build failed
+            for index, compiled in enumerate(self._compiled):
+                match = compiled.match(line)
+                if match:
+                    return index, match, 0
+            return None
+
+        # Digit-led lines get the digit-anchored bucket first; other lines
+        # can't match those patterns at all, so the bucket is skipped
+        if line and line[0].isdigit() and self._digit_dispatch is not None:
+            hit = self._match_bucket(self._digit_dispatch, line)
+            if hit is not None:
+                return hit
+
+        if self._general_dispatch is not None:
+            return self._match_bucket(self._general_dispatch, line)
+
+        return None
+
+    def _match_hyperscan(self, line: str):
+        """Match via Hyperscan; NotImplemented signals a scan-time failure."""
+        hits = []
+        try:
+            self._hs_db.scan(
+                line.encode('utf-8'),
+                match_event_handler=lambda pat_id, start, end, flags, ctx: ctx.append(pat_id),
+                context=hits
+            )
+        except Exception:
+            return NotImplemented
+
+        if not hits:
+            return None
+
+        # Lowest ID is the highest-priority pattern; re-run only that
+        # pattern's Python regex to capture groups
+        index = min(hits)
+        match = self._compiled[index].match(line)
+        if match is None:
+            # Semantics drift between engines - defer to the regular dispatch
+            return NotImplemented
+        return index, match, 0
+
+    def _match_bucket(self, dispatch, line: str) -> Optional[Tuple[int, 're.Match', int]]:
+        combined, routes = dispatch
+        match = combined.match(line)
+        if match is None:
+            return None
+        index, outer_group = routes[match.lastgroup]
+        return index, match, outer_group
+
+    def match_and_extract(self, line: str) -> Optional[Dict[str, Any]]:
+        """Match a line and extract its fields, or None if no pattern matched."""
+        hit = self.match_line(line)
+        if hit is None:
+            return None
+
+        index, match, outer_group = hit
+        result = self._extract_fields(match, index, outer_group)
+        result['pattern_used'] = self._names[index]
+        return result
+
+    def add_pattern(self, parse_pattern: ParsePattern):
+        """Insert a pattern maintaining priority order and rebuild dispatch."""
+        insert_index = len(self.patterns)
+        for i, existing_pattern in enumerate(self.patterns):
+            if existing_pattern.priority < parse_pattern.priority:
+                insert_index = i
+                break
+
+        self.patterns.insert(insert_index, parse_pattern)
+        self._build_dispatch()
+
     def parse_line(self, line: str) -> Dict[str, Any]:
         """Parse a log line using the best matching pattern."""
         line = line.strip()
         if not line:
             return {}
-        
+
         # Try JSON first
         json_result = self._try_json_parse(line)
         if json_result:
             return json_result
-        
+
         # Try regex patterns
-        for pattern in self.patterns:
-            match = pattern.pattern.match(line)
-            if match:
-                result = self._extract_fields(match, pattern)
-                result['pattern_used'] = pattern.name
-                return result
-        
+        result = self.match_and_extract(line)
+        if result is not None:
+            return result
+
         # If no pattern matches, return raw line
         return {
             'raw_line': line,
@@ -166,51 +438,80 @@ class LogPatterns:
     
     def _try_json_parse(self, line: str) -> Dict[str, Any]:
         """Try to parse line as JSON."""
+        # memchr-level check: no brace means no JSON, skip everything
+        pos = line.find('{')
+        if pos < 0:
+            return {}
+
+        # Whole-line JSON object: parse directly, no regex scan needed
+        if pos == 0 and line.endswith('}'):
+            try:
+                data = _json_loads(line)
+            except ValueError:
+                data = None
+            if isinstance(data, dict):
+                return self._json_result(data)
+
         try:
-            # Look for JSON objects in the line
-            json_match = re.search(r'(\{.*\})', line)
+            # Look for JSON objects embedded in the line
+            json_match = _JSON_SCAN.search(line, pos)
             if json_match:
-                json_str = json_match.group(1)
-                data = json.loads(json_str)
-                
-                # Extract common fields
-                result = {
-                    'json_data': data,
-                    'pattern_used': 'json_log'
-                }
-                
-                # Add common fields if they exist
-                if 'timestamp' in data:
-                    result['timestamp'] = data['timestamp']
-                if 'time' in data:
-                    result['timestamp'] = data['time']
-                if 'level' in data:
-                    result['level'] = data['level']
-                if 'message' in data:
-                    result['message'] = data['message']
-                if 'msg' in data:
-                    result['message'] = data['msg']
-                
-                return result
-        except (json.JSONDecodeError, KeyError):
+                data = _json_loads(json_match.group(1))
+                if isinstance(data, dict):
+                    return self._json_result(data)
+        except (ValueError, KeyError):
             pass
-        
+
         return {}
+
+    def _json_result(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a parse result from a decoded JSON log object."""
+        result = {
+            'json_data': data,
+            'pattern_used': 'json_log'
+        }
+
+        # Add common fields if they exist
+        if 'timestamp' in data:
+            result['timestamp'] = data['timestamp']
+        if 'time' in data:
+            result['timestamp'] = data['time']
+        if 'level' in data:
+            result['level'] = data['level']
+        if 'message' in data:
+            result['message'] = data['message']
+        if 'msg' in data:
+            result['message'] = data['msg']
+
+        return result
     
-    def _extract_fields(self, match: re.Match, pattern: ParsePattern) -> Dict[str, Any]:
+    def _extract_fields(self, match: re.Match, index: int, outer_group: int = 0) -> Dict[str, Any]:
         """Extract fields from regex match."""
-        result = {}
-        
-        groups = match.groups()
-        for i, field_name in enumerate(pattern.fields):
-            if i < len(groups):
-                value = groups[i]
+        extractor = self._extractors[index]
+        if extractor is not None:
+            result = extractor(match, outer_group)
+        else:
+            # Generic path: fields start at group outer_group + 1 in the
+            # combined regex (outer_group is 0 for a standalone match).
+            # Indexed match[i] access avoids materializing the groups()
+            # tuple - one allocation per capture saved on every line
+            fields = self._fields[index]
+            first = outer_group + 1
+            count = min(len(fields), self._compiled[index].groups)
+            result = {}
+            for i in range(count):
+                value = match[first + i]
                 if value:
-                    result[field_name] = value.strip()
+                    result[fields[i]] = value.strip()
         
-        # Post-process common fields
+        # Post-process common fields. The timestamp is parsed exactly once:
+        # the datetime is kept alongside the ISO string so downstream
+        # consumers don't run the format dispatch a second time.
         if 'timestamp' in result:
-            result['timestamp'] = self._normalize_timestamp(result['timestamp'])
+            dt = parse_timestamp(result['timestamp'])
+            if dt is not None:
+                result['timestamp'] = dt.isoformat()
+                result['_timestamp_dt'] = dt
         
         if 'level' in result:
             result['level'] = result['level'].upper()
@@ -222,34 +523,8 @@ class LogPatterns:
     
     def _normalize_timestamp(self, timestamp_str: str) -> str:
         """Normalize timestamp to ISO format."""
-        try:
-            # Common timestamp formats
-            formats = [
-                '%Y-%m-%d %H:%M:%S,%f',
-                '%Y-%m-%d %H:%M:%S',
-                '%Y/%m/%d %H:%M:%S',
-                '%Y/%m/%d %H:%M:%S,%f',
-                '%b %d %H:%M:%S',
-                '%b %d %H:%M:%S %Y',
-                '%d/%b/%Y:%H:%M:%S %z',
-                '%Y-%m-%dT%H:%M:%S.%fZ',
-                '%Y-%m-%dT%H:%M:%SZ',
-                '%Y-%m-%dT%H:%M:%S.%f',
-                '%Y-%m-%dT%H:%M:%S'
-            ]
-            
-            for fmt in formats:
-                try:
-                    dt = datetime.datetime.strptime(timestamp_str, fmt)
-                    return dt.isoformat()
-                except ValueError:
-                    continue
-            
-            # If no format matches, return original
-            return timestamp_str
-            
-        except Exception:
-            return timestamp_str
+        dt = parse_timestamp(timestamp_str)
+        return dt.isoformat() if dt is not None else timestamp_str
     
     def _parse_http_request(self, request_str: str) -> Dict[str, str]:
         """Parse HTTP request string."""
@@ -281,108 +556,165 @@ class LogPatterns:
 
 class ErrorPatterns:
     """Patterns for detecting and classifying errors."""
-    
+
+    # Literal anchor tokens per category: a category's regexes can only match
+    # if at least one of its anchors appears in the lowercased message, so a
+    # single cheap literal scan can skip whole categories before any regex runs.
+    _CATEGORY_ANCHORS = {
+        'database_errors': ('connection', 'database', 'deadlock', 'constraint',
+                            'mysql', 'postgres', 'mongodb', 'sql', 'query'),
+        'network_errors': ('connection', 'timeout', 'network', 'dns', 'host',
+                           'ssl', 'certificate'),
+        'application_errors': ('null', 'segmentation', 'memory', 'permission',
+                               'access', 'file', 'directory'),
+        'authentication_errors': ('credentials', 'authentication', 'unauthorized',
+                                  'forbidden', 'session', 'token'),
+        'system_errors': ('disk', 'space', 'memory', 'cpu', 'service', 'system')
+    }
+
+    # Component alternation: one scan finds every component mention instead of
+    # eight separate re.search calls (the old tuples held raw strings, so each
+    # call also paid a re-compile cache lookup)
+    _COMPONENT_ORDER = ('database', 'service', 'authentication', 'storage',
+                        'network', 'system', 'messaging', 'cache')
+    _COMPONENT_SCAN = re.compile(
+        r'(?P<database>database|db)'
+        r'|(?P<service>api|service|endpoint)'
+        r'|(?P<authentication>user|account|auth)'
+        r'|(?P<storage>file|disk|storage)'
+        r'|(?P<network>network|connection|socket)'
+        r'|(?P<system>memory|cpu|ram)'
+        r'|(?P<messaging>queue|message|event)'
+        r'|(?P<cache>cache|redis|memcached)'
+    )
+
     def __init__(self):
         self.error_patterns = self._initialize_error_patterns()
-    
+        self._anchor_categories, self._anchor_scan = self._build_anchor_scan()
+
     def _initialize_error_patterns(self) -> Dict[str, List[Pattern]]:
         """Initialize error detection patterns."""
+        # Patterns are lowercase and matched against the lowercased message,
+        # so IGNORECASE is unnecessary and the engine can use literal fast paths
         return {
             'database_errors': [
-                re.compile(r'(connection.*timeout|database.*unavailable|deadlock|constraint.*violation)', re.IGNORECASE),
-                re.compile(r'(mysql|postgres|mongodb).*error', re.IGNORECASE),
-                re.compile(r'(sql.*syntax|query.*failed)', re.IGNORECASE)
+                re.compile(r'(connection.*timeout|database.*unavailable|deadlock|constraint.*violation)'),
+                re.compile(r'(mysql|postgres|mongodb).*error'),
+                re.compile(r'(sql.*syntax|query.*failed)')
             ],
             'network_errors': [
-                re.compile(r'(connection.*refused|timeout|network.*unreachable)', re.IGNORECASE),
-                re.compile(r'(dns.*error|host.*not.*found)', re.IGNORECASE),
-                re.compile(r'(ssl.*error|certificate.*error)', re.IGNORECASE)
+                re.compile(r'(connection.*refused|timeout|network.*unreachable)'),
+                re.compile(r'(dns.*error|host.*not.*found)'),
+                re.compile(r'(ssl.*error|certificate.*error)')
             ],
             'application_errors': [
-                re.compile(r'(null.*pointer|segmentation.*fault|out.*of.*memory)', re.IGNORECASE),
-                re.compile(r'(permission.*denied|access.*denied)', re.IGNORECASE),
-                re.compile(r'(file.*not.*found|directory.*not.*found)', re.IGNORECASE)
+                re.compile(r'(null.*pointer|segmentation.*fault|out.*of.*memory)'),
+                re.compile(r'(permission.*denied|access.*denied)'),
+                re.compile(r'(file.*not.*found|directory.*not.*found)')
             ],
             'authentication_errors': [
-                re.compile(r'(invalid.*credentials|authentication.*failed)', re.IGNORECASE),
-                re.compile(r'(unauthorized|forbidden)', re.IGNORECASE),
-                re.compile(r'(session.*expired|token.*expired)', re.IGNORECASE)
+                re.compile(r'(invalid.*credentials|authentication.*failed)'),
+                re.compile(r'(unauthorized|forbidden)'),
+                re.compile(r'(session.*expired|token.*expired)')
             ],
             'system_errors': [
-                re.compile(r'(disk.*full|out.*of.*space)', re.IGNORECASE),
-                re.compile(r'(memory.*leak|cpu.*overload)', re.IGNORECASE),
-                re.compile(r'(service.*unavailable|system.*down)', re.IGNORECASE)
+                re.compile(r'(disk.*full|out.*of.*space)'),
+                re.compile(r'(memory.*leak|cpu.*overload)'),
+                re.compile(r'(service.*unavailable|system.*down)')
             ]
         }
-    
-    def classify_error(self, message: str) -> List[str]:
+
+    def _build_anchor_scan(self) -> Tuple[Dict[str, List[str]], Pattern]:
+        """Build the literal anchor prefilter used by classify_error."""
+        anchor_categories = {}
+        for category, anchors in self._CATEGORY_ANCHORS.items():
+            for anchor in anchors:
+                anchor_categories.setdefault(anchor, []).append(category)
+
+        # Longest-first so overlapping anchors (e.g. 'mysql'/'sql') match whole
+        needles = sorted(anchor_categories, key=len, reverse=True)
+        scan = re.compile('|'.join(map(re.escape, needles)))
+        return anchor_categories, scan
+
+    def classify_error(self, message: str, message_lower: Optional[str] = None) -> List[str]:
         """Classify error message into error types."""
+        if message_lower is None:
+            message_lower = message.lower()
+
+        # One literal pass to find candidate categories; categories without
+        # an anchor hit are skipped without running their regexes at all
+        candidates = set()
+        for match in self._anchor_scan.finditer(message_lower):
+            candidates.update(self._anchor_categories[match.group()])
+
+        if not candidates:
+            return ['unknown']
+
         classifications = []
-        
         for error_type, patterns in self.error_patterns.items():
+            if error_type not in candidates:
+                continue
             for pattern in patterns:
-                if pattern.search(message):
+                if pattern.search(message_lower):
                     classifications.append(error_type)
                     break
-        
+
         return classifications if classifications else ['unknown']
     
     def get_error_context(self, message: str) -> Dict[str, Any]:
         """Extract context from error message."""
+        # Lowercase once; every helper scans the same string
+        message_lower = message.lower()
         context = {
-            'error_types': self.classify_error(message),
-            'severity': self._determine_severity(message),
-            'components': self._extract_components(message),
-            'actions': self._suggest_actions(message)
+            'error_types': self.classify_error(message, message_lower),
+            'severity': self._determine_severity(message, message_lower),
+            'components': self._extract_components(message, message_lower),
+            'actions': self._suggest_actions(message, message_lower)
         }
         
         return context
     
-    def _determine_severity(self, message: str) -> str:
+    # Severity keywords grouped by level; group index gives the level.
+    # 'warn' also covers 'warning'.
+    _SEVERITY_SCAN = re.compile(
+        r'(fatal|critical|crash|down|unavailable)'
+        r'|(warn|timeout|retry)'
+        r'|(info|debug|trace)'
+    )
+    _SEVERITY_LEVELS = ('CRITICAL', 'WARNING', 'INFO')
+
+    def _determine_severity(self, message: str, message_lower: Optional[str] = None) -> str:
         """Determine error severity from message."""
-        message_lower = message.lower()
-        
-        critical_keywords = ['fatal', 'critical', 'crash', 'down', 'unavailable']
-        warning_keywords = ['warn', 'warning', 'timeout', 'retry']
-        info_keywords = ['info', 'debug', 'trace']
-        
-        if any(keyword in message_lower for keyword in critical_keywords):
-            return 'CRITICAL'
-        elif any(keyword in message_lower for keyword in warning_keywords):
-            return 'WARNING'
-        elif any(keyword in message_lower for keyword in info_keywords):
-            return 'INFO'
-        else:
-            return 'ERROR'
+        if message_lower is None:
+            message_lower = message.lower()
+
+        # One scan over the message; keep the most severe group seen so the
+        # critical > warning > info precedence of the old keyword lists holds
+        best = len(self._SEVERITY_LEVELS) + 1
+        for match in self._SEVERITY_SCAN.finditer(message_lower):
+            if match.lastindex < best:
+                best = match.lastindex
+                if best == 1:
+                    break
+
+        if best <= len(self._SEVERITY_LEVELS):
+            return self._SEVERITY_LEVELS[best - 1]
+        return 'ERROR'
     
-    def _extract_components(self, message: str) -> List[str]:
+    def _extract_components(self, message: str, message_lower: Optional[str] = None) -> List[str]:
         """Extract affected components from error message."""
-        components = []
-        
-        # Common component patterns
-        component_patterns = [
-            (r'(database|db)', 'database'),
-            (r'(api|service|endpoint)', 'service'),
-            (r'(user|account|auth)', 'authentication'),
-            (r'(file|disk|storage)', 'storage'),
-            (r'(network|connection|socket)', 'network'),
-            (r'(memory|cpu|ram)', 'system'),
-            (r'(queue|message|event)', 'messaging'),
-            (r'(cache|redis|memcached)', 'cache')
-        ]
-        
-        message_lower = message.lower()
-        for pattern, component in component_patterns:
-            if re.search(pattern, message_lower):
-                components.append(component)
-        
-        return components
+        if message_lower is None:
+            message_lower = message.lower()
+        hits = {match.lastgroup for match in self._COMPONENT_SCAN.finditer(message_lower)}
+        # Emit in declaration order to keep the historical output stable
+        return [component for component in self._COMPONENT_ORDER if component in hits]
     
-    def _suggest_actions(self, message: str) -> List[str]:
+    def _suggest_actions(self, message: str, message_lower: Optional[str] = None) -> List[str]:
         """Suggest actions based on error message."""
         actions = []
-        
-        message_lower = message.lower()
+
+        if message_lower is None:
+            message_lower = message.lower()
         
         if 'timeout' in message_lower:
             actions.append('Check network connectivity')
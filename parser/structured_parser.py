@@ -6,18 +6,36 @@ Provides intelligent parsing with context awareness and error handling.
 
 import asyncio
 import logging
+import os
 import re
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional, Union, Tuple
 from dataclasses import dataclass
 from datetime import datetime
-import traceback
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 from config import Config
-from parser.patterns import log_patterns, error_patterns
+from parser.patterns import ParsePattern, log_patterns, error_patterns, parse_timestamp
 
 logger = logging.getLogger(__name__)
 
+# Compiled once at import instead of per call through re's bounded cache
+_JSON_SCAN = re.compile(r'(\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\})')
+_TS_FALLBACK = re.compile(r'(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d{3})?(?:Z|[+-]\d{2}:\d{2})?)')
+_LEVEL_FALLBACK = re.compile(r'\b(TRACE|DEBUG|INFO|WARN|WARNING|ERROR|FATAL|CRITICAL)\b', re.IGNORECASE)
+
+# Nested quantifier like (a+)+ or (a*){2,} - the classic catastrophic
+# backtracking shape
+_NESTED_QUANTIFIER = re.compile(r'\((?:[^()\\]|\\.)*[+*]\)\s*[+*{]')
+
 
 @dataclass
 class ParsedLogEntry:
@@ -51,12 +69,22 @@ class StructuredParser:
         self.patterns = log_patterns
         self.error_classifier = error_patterns
         
-        # Caching for performance
+        # Caching for performance; the lock serializes eviction, which
+        # batch parsing hits from multiple pool threads
         self._parse_cache = {}
         self._cache_size = 1000
-    
+        self._cache_lock = threading.Lock()
+
+        # Shared pool for batch parsing, created on first use
+        self._executor = None
+        self._batch_chunk_size = 1000
+
     async def parse(self, log_entry: Union[Dict[str, Any], str]) -> ParsedLogEntry:
         """Parse a log entry into structured format."""
+        return self._parse_sync(log_entry)
+
+    def _parse_sync(self, log_entry: Union[Dict[str, Any], str]) -> ParsedLogEntry:
+        """Synchronous parsing core, shared by parse and batch_parse workers."""
         try:
             # Handle different input formats
             if isinstance(log_entry, str):
@@ -68,9 +96,12 @@ class StructuredParser:
             else:
                 raise ValueError("Invalid log entry format")
             
-            # Check cache first
-            cache_key = hash(raw_line)
-            if cache_key in self._parse_cache:
+            # Check cache first. The line itself is the key: dict lookup is
+            # true-equality so distinct lines can never collide (hash(raw_line)
+            # could silently return the wrong entry). Very long lines are not
+            # cached - hashing multi-KB strings costs more than reparsing saves.
+            cache_key = raw_line if len(raw_line) <= 512 else None
+            if cache_key is not None and cache_key in self._parse_cache:
                 return self._parse_cache[cache_key]
             
             # Parse the log entry
@@ -79,9 +110,14 @@ class StructuredParser:
             # Classify errors
             error_context = self.error_classifier.get_error_context(parsed_data.get('message', ''))
             
-            # Create structured entry
+            # Create structured entry (reuse the datetime captured during
+            # field extraction instead of reparsing the ISO string)
+            timestamp_dt = parsed_data.get('_timestamp_dt')
+            if timestamp_dt is None:
+                timestamp_dt = self._parse_timestamp(parsed_data.get('timestamp'))
+
             structured_entry = ParsedLogEntry(
-                timestamp=self._parse_timestamp(parsed_data.get('timestamp')),
+                timestamp=timestamp_dt,
                 level=parsed_data.get('level', 'INFO'),
                 message=parsed_data.get('message', raw_line),
                 source=source,
@@ -97,13 +133,16 @@ class StructuredParser:
             )
             
             # Add to cache
-            self._add_to_cache(cache_key, structured_entry)
+            if cache_key is not None:
+                self._add_to_cache(cache_key, structured_entry)
             
             return structured_entry
             
         except Exception as e:
-            logger.error(f"Error parsing log entry: {e}")
-            logger.debug(f"Traceback: {traceback.format_exc()}")
+            logger.error("Error parsing log entry: %s", e)
+            # exc_info defers the stack walk/formatting until a DEBUG handler
+            # actually consumes the record
+            logger.debug("Parse error detail", exc_info=True)
             
             # Return fallback entry
             return ParsedLogEntry(
@@ -133,87 +172,78 @@ class StructuredParser:
         if json_result:
             return json_result
         
-        # Try regex patterns
-        for pattern in self.patterns.patterns:
-            match = pattern.pattern.match(line)
-            if match:
-                result = self._extract_fields(match, pattern)
-                result['pattern_used'] = pattern.name
-                return result
-        
+        # Try regex patterns via the pattern bank's combined dispatch
+        result = self.patterns.match_and_extract(line)
+        if result is not None:
+            return result
+
         # Fallback to generic parsing
         return self._fallback_parse(line)
     
     def _try_json_parse(self, line: str) -> Optional[Dict[str, Any]]:
         """Try to parse line as JSON."""
+        # memchr-level check: no brace means no JSON, skip everything
+        pos = line.find('{')
+        if pos < 0:
+            return None
+
+        # Whole-line JSON object: parse directly, no regex scan needed
+        if pos == 0 and line.endswith('}'):
+            try:
+                data = _json_loads(line)
+            except ValueError:
+                data = None
+            if isinstance(data, dict):
+                return self._json_result(data)
+
         try:
-            # Look for JSON objects in the line
-            json_matches = re.findall(r'(\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\})', line)
-            
+            # Look for JSON objects embedded in the line
+            json_matches = _JSON_SCAN.findall(line, pos)
+
             if json_matches:
                 # Use the largest JSON object (most complete)
                 json_str = max(json_matches, key=len)
-                data = json.loads(json_str)
-                
-                # Extract common fields
-                result = {
-                    'json_data': data,
-                    'pattern_used': 'json_log'
-                }
-                
-                # Add common fields if they exist
-                if 'timestamp' in data:
-                    result['timestamp'] = data['timestamp']
-                elif 'time' in data:
-                    result['timestamp'] = data['time']
-                elif '@timestamp' in data:
-                    result['timestamp'] = data['@timestamp']
-                
-                if 'level' in data:
-                    result['level'] = data['level']
-                elif 'severity' in data:
-                    result['level'] = data['severity']
-                
-                if 'message' in data:
-                    result['message'] = data['message']
-                elif 'msg' in data:
-                    result['message'] = data['msg']
-                elif 'log' in data:
-                    result['message'] = data['log']
-                
-                # Extract additional fields
-                for key, value in data.items():
-                    if key not in ['timestamp', 'time', '@timestamp', 'level', 'severity', 'message', 'msg', 'log']:
-                        result[key] = value
-                
-                return result
-                
-        except (json.JSONDecodeError, KeyError, TypeError):
+                data = _json_loads(json_str)
+                if isinstance(data, dict):
+                    return self._json_result(data)
+
+        except (ValueError, KeyError, TypeError):
             pass
-        
+
         return None
-    
-    def _extract_fields(self, match: re.Match, pattern) -> Dict[str, Any]:
-        """Extract fields from regex match."""
-        result = {}
-        
-        groups = match.groups()
-        for i, field_name in enumerate(pattern.fields):
-            if i < len(groups):
-                value = groups[i]
-                if value:
-                    result[field_name] = value.strip()
-        
-        # Post-process common fields
-        if 'timestamp' in result:
-            result['timestamp'] = self._normalize_timestamp(result['timestamp'])
-        
-        if 'level' in result:
-            result['level'] = result['level'].upper()
-        
-        if 'request' in result:
-            result.update(self._parse_http_request(result['request']))
-        
+
+    def _json_result(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a parse result from a decoded JSON log object."""
+        result = {
+            'json_data': data,
+            'pattern_used': 'json_log'
+        }
+
+        # Add common fields if they exist
+        if 'timestamp' in data:
+            result['timestamp'] = data['timestamp']
+        elif 'time' in data:
+            result['timestamp'] = data['time']
+        elif '@timestamp' in data:
+            result['timestamp'] = data['@timestamp']
+
+        if 'level' in data:
+            result['level'] = data['level']
+        elif 'severity' in data:
+            result['level'] = data['severity']
+
+        if 'message' in data:
+            result['message'] = data['message']
+        elif 'msg' in data:
+            result['message'] = data['msg']
+        elif 'log' in data:
+            result['message'] = data['log']
+
+        # Extract additional fields
+        for key, value in data.items():
+            if key not in ['timestamp', 'time', '@timestamp', 'level', 'severity', 'message', 'msg', 'log']:
+                result[key] = value
+
         return result
     
     def _fallback_parse(self, line: str) -> Dict[str, Any]:
@@ -224,12 +254,12 @@ class StructuredParser:
         }
         
         # Try to extract timestamp
-        timestamp_match = re.search(r'(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d{3})?(?:Z|[+-]\d{2}:\d{2})?)', line)
+        timestamp_match = _TS_FALLBACK.search(line)
         if timestamp_match:
             result['timestamp'] = timestamp_match.group(1)
-        
+
         # Try to extract log level
-        level_match = re.search(r'\b(TRACE|DEBUG|INFO|WARN|WARNING|ERROR|FATAL|CRITICAL)\b', line, re.IGNORECASE)
+        level_match = _LEVEL_FALLBACK.search(line)
         if level_match:
             result['level'] = level_match.group(1).upper()
         
@@ -247,80 +277,12 @@ class StructuredParser:
         
         return result
     
-    def _normalize_timestamp(self, timestamp_str: str) -> str:
-        """Normalize timestamp to ISO format."""
-        try:
-            # Common timestamp formats
-            formats = [
-                '%Y-%m-%d %H:%M:%S,%f',
-                '%Y-%m-%d %H:%M:%S',
-                '%Y/%m/%d %H:%M:%S',
-                '%Y/%m/%d %H:%M:%S,%f',
-                '%b %d %H:%M:%S',
-                '%b %d %H:%M:%S %Y',
-                '%d/%b/%Y:%H:%M:%S %z',
-                '%Y-%m-%dT%H:%M:%S.%fZ',
-                '%Y-%m-%dT%H:%M:%SZ',
-                '%Y-%m-%dT%H:%M:%S.%f',
-                '%Y-%m-%dT%H:%M:%S'
-            ]
-            
-            for fmt in formats:
-                try:
-                    dt = datetime.strptime(timestamp_str, fmt)
-                    return dt.isoformat()
-                except ValueError:
-                    continue
-            
-            # If no format matches, return original
-            return timestamp_str
-            
-        except Exception:
-            return timestamp_str
-    
-    def _parse_http_request(self, request_str: str) -> Dict[str, str]:
-        """Parse HTTP request string."""
-        try:
-            parts = request_str.split()
-            if len(parts) >= 2:
-                return {
-                    'http_method': parts[0],
-                    'http_path': parts[1],
-                    'http_version': parts[2] if len(parts) > 2 else ''
-                }
-        except Exception:
-            pass
-        
-        return {}
-    
     def _parse_timestamp(self, timestamp_str: str) -> Optional[datetime]:
         """Parse timestamp string to datetime object."""
         if not timestamp_str:
             return None
-        
-        # Common timestamp formats
-        formats = [
-            '%Y-%m-%d %H:%M:%S,%f',
-            '%Y-%m-%d %H:%M:%S',
-            '%Y/%m/%d %H:%M:%S',
-            '%Y/%m/%d %H:%M:%S,%f',
-            '%b %d %H:%M:%S',
-            '%b %d %H:%M:%S %Y',
-            '%d/%b/%Y:%H:%M:%S %z',
-            '%Y-%m-%dT%H:%M:%S.%fZ',
-            '%Y-%m-%dT%H:%M:%SZ',
-            '%Y-%m-%dT%H:%M:%S.%f',
-            '%Y-%m-%dT%H:%M:%S'
-        ]
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(timestamp_str, fmt)
-            except ValueError:
-                continue
-        
-        # If all formats fail, return None
-        return None
+
+        return parse_timestamp(timestamp_str)
     
     def _calculate_confidence(self, parsed_data: Dict[str, Any]) -> float:
         """Calculate confidence score for parsing result."""
@@ -344,19 +306,46 @@ class StructuredParser:
         
         return min(confidence, 1.0)
     
-    def _add_to_cache(self, key: int, entry: ParsedLogEntry):
+    def _add_to_cache(self, key: str, entry: ParsedLogEntry):
         """Add parsed entry to cache."""
-        if len(self._parse_cache) >= self._cache_size:
-            # Remove oldest entries
-            oldest_key = next(iter(self._parse_cache))
-            del self._parse_cache[oldest_key]
-        
-        self._parse_cache[key] = entry
+        # Two pool threads can race the eviction; without the lock both
+        # pick the same oldest key and the loser's delete raises
+        with self._cache_lock:
+            if len(self._parse_cache) >= self._cache_size:
+                # Remove oldest entries
+                oldest_key = next(iter(self._parse_cache))
+                self._parse_cache.pop(oldest_key, None)
+
+            self._parse_cache[key] = entry
     
     async def batch_parse(self, log_entries: List[Union[Dict[str, Any], str]]) -> List[ParsedLogEntry]:
-        """Parse multiple log entries efficiently."""
-        tasks = [self.parse(entry) for entry in log_entries]
-        return await asyncio.gather(*tasks)
+        """Parse multiple log entries efficiently.
+
+        Parsing is CPU-bound regex work, so gathering coroutines buys no
+        parallelism. Large batches are chunked across a thread pool, which
+        at least overlaps parsing with the event loop's other work; small
+        batches are parsed inline to skip executor overhead.
+        """
+        if len(log_entries) <= self._batch_chunk_size:
+            return [self._parse_sync(entry) for entry in log_entries]
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+        loop = asyncio.get_running_loop()
+        chunks = [
+            log_entries[i:i + self._batch_chunk_size]
+            for i in range(0, len(log_entries), self._batch_chunk_size)
+        ]
+        chunk_results = await asyncio.gather(*[
+            loop.run_in_executor(self._executor, self._parse_many, chunk)
+            for chunk in chunks
+        ])
+        return [entry for chunk in chunk_results for entry in chunk]
+
+    def _parse_many(self, chunk: List[Union[Dict[str, Any], str]]) -> List[ParsedLogEntry]:
+        """Worker body: parse one chunk synchronously."""
+        return [self._parse_sync(entry) for entry in chunk]
     
     def get_parsing_stats(self) -> Dict[str, Any]:
         """Get statistics about parsing performance."""
@@ -372,28 +361,43 @@ class StructuredParser:
         """Add a custom parsing pattern."""
         try:
             compiled_pattern = re.compile(pattern)
-            new_pattern = type('CustomPattern', (), {
-                'name': name,
-                'pattern': compiled_pattern,
-                'fields': fields,
-                'description': description,
-                'priority': priority
-            })()
-            
-            # Insert into patterns list maintaining priority order
-            insert_index = 0
-            for i, existing_pattern in enumerate(self.patterns.patterns):
-                if existing_pattern.priority < priority:
-                    insert_index = i
-                    break
-                insert_index = i + 1
-            
-            self.patterns.patterns.insert(insert_index, new_pattern)
+            self._check_pattern_safety(compiled_pattern)
+            new_pattern = ParsePattern(
+                name=name,
+                pattern=compiled_pattern,
+                fields=fields,
+                description=description,
+                priority=priority
+            )
+
+            # Insert into the pattern bank (rebuilds the combined dispatch)
+            self.patterns.add_pattern(new_pattern)
             logger.info(f"Added custom pattern: {name}")
-            
+
         except re.error as e:
             logger.error(f"Invalid regex pattern: {e}")
             raise ValueError(f"Invalid regex pattern: {e}")
+
+    def _check_pattern_safety(self, compiled: 're.Pattern'):
+        """Reject patterns likely to exhibit catastrophic backtracking.
+
+        Custom patterns enter the shared hot-path dispatch, so one
+        ReDoS-prone pattern would degrade parse_line for every caller.
+        Nested quantifiers are rejected statically; anything else is probed
+        against short synthetic inputs with growing length so an exponential
+        pattern is caught while its search space is still small.
+        """
+        if _NESTED_QUANTIFIER.search(compiled.pattern):
+            logger.error("Rejected custom pattern with nested quantifiers: %s", compiled.pattern)
+            raise ValueError(f"Pattern rejected (nested quantifiers): {compiled.pattern}")
+
+        for length in (8, 12, 16, 20):
+            for probe in ('a' * length, 'a' * length + '!', ' ' * length):
+                start = time.perf_counter()
+                compiled.search(probe)
+                if time.perf_counter() - start > 0.01:
+                    logger.error("Rejected slow custom pattern: %s", compiled.pattern)
+                    raise ValueError(f"Pattern rejected (backtracking too slow): {compiled.pattern}")
     
     def clear_cache(self):
         """Clear the parsing cache."""
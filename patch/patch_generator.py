@@ -5,21 +5,154 @@ Supports multiple patch formats and ensures safe deployment.
 """
 
 import asyncio
+import concurrent.futures
+import errno
+import functools
+import hashlib
+import io
+import itertools
 import logging
+from collections import OrderedDict
 import os
 import re
 import json
 import shutil
+import threading
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
+from types import MappingProxyType
 import traceback
 
+try:
+    import xxhash  # Optional: faster 64-bit fingerprints for cache keys
+except ImportError:
+    xxhash = None
+
+try:
+    import fcntl  # Copy-on-write file clones for backups (Linux only)
+except ImportError:
+    fcntl = None
+
+# FICLONE ioctl: clone src fd into dst fd without copying bytes
+# (supported on reflink-capable filesystems such as Btrfs and XFS)
+_FICLONE = 0x40049409
+
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+if xxhash is not None:
+    _new_fingerprint = xxhash.xxh3_64
+
+    def _fingerprint_digest(h) -> int:
+        return h.intdigest()
+else:
+    def _new_fingerprint():
+        return hashlib.blake2b(digest_size=8)
+
+    def _fingerprint_digest(h) -> int:
+        return int.from_bytes(h.digest(), 'little')
+
+
+# Fixed patch-text skeletons: one format() per header instead of
+# line-by-line appends
+_GIT_HEADER_TMPL = (
+    "From: DevOps AI <devops-ai@example.com>\n"
+    "Date: {date}\n"
+    "Subject: [PATCH] {subject}\n"
+    "\n"
+    "--- a/{file}\n"
+    "+++ b/{file}\n"
+    "@@ -1,5 +1,5 @@"
+)
+
+_UNIFIED_HEADER_TMPL = (
+    "--- a/{file}\n"
+    "+++ b/{file}\n"
+    "@@ -1,5 +1,5 @@"
+)
+
+_CONTEXT_HEADER_TMPL = (
+    "*** a/{file}\n"
+    "--- b/{file}\n"
+    "***************"
+)
+
+
+def _git_pair_into(fwd: io.StringIO, rev: io.StringIO, description: str,
+                   affected_files: Dict[str, Dict[str, Any]], date_str: str):
+    """Write a Git-format patch and its rollback in a single pass."""
+    first_file = next(iter(affected_files))
+
+    fwd.write(_GIT_HEADER_TMPL.format(
+        date=date_str, subject=description, file=first_file))
+    rev.write(_GIT_HEADER_TMPL.format(
+        date=date_str, subject=f"Rollback: {description}", file=first_file))
+
+    # One walk over affected_files emits both directions: the rollback
+    # is the forward hunk with the -/+ lines swapped.
+    for change_info in affected_files.values():
+        original = change_info['search_pattern']
+        modified = change_info['replace_pattern']
+
+        fwd.write(f"\n-    {original}\n+    {modified}")
+        rev.write(f"\n-    {modified}\n+    {original}")
+
+
+def _unified_pair_into(fwd: io.StringIO, rev: io.StringIO, description: str,
+                       affected_files: Dict[str, Dict[str, Any]], date_str: str):
+    """Write a unified diff patch and its rollback in a single pass."""
+    header = _UNIFIED_HEADER_TMPL.format(file=next(iter(affected_files)))
+    fwd.write(header)
+    rev.write(header)
+
+    for change_info in affected_files.values():
+        original = change_info['search_pattern']
+        modified = change_info['replace_pattern']
+
+        fwd.write(f"\n-    {original}\n+    {modified}")
+        rev.write(f"\n-    {modified}\n+    {original}")
+
+
+def _context_pair_into(fwd: io.StringIO, rev: io.StringIO, description: str,
+                       affected_files: Dict[str, Dict[str, Any]], date_str: str):
+    """Write a context diff patch and its rollback in a single pass."""
+    header = _CONTEXT_HEADER_TMPL.format(file=next(iter(affected_files)))
+    fwd.write(header)
+    rev.write(header)
+
+    for change_info in affected_files.values():
+        original = change_info['search_pattern']
+        modified = change_info['replace_pattern']
+
+        fwd.write(f"\n*** 1,5 ****\n      {original}\n--- 1,5 ----\n      {modified}")
+        rev.write(f"\n*** 1,5 ****\n      {modified}\n--- 1,5 ----\n      {original}")
+
+
+_PAIR_WRITERS = {
+    'git': _git_pair_into,
+    'unified': _unified_pair_into,
+    'context': _context_pair_into,
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def _mock_filename(file_pattern: str) -> str:
+    """Derive the mock affected-file name for a change's file pattern."""
+    return f"mock_file_{hash(file_pattern) % 1000}.py"
+
+
+def _build_pair_text(patch_format: str, description: str,
+                     affected_files: Dict[str, Dict[str, Any]],
+                     date_str: str) -> Tuple[str, str]:
+    """Process-pool entry point: only plain data crosses the boundary."""
+    fwd = io.StringIO()
+    rev = io.StringIO()
+    _PAIR_WRITERS[patch_format](fwd, rev, description, affected_files, date_str)
+    return fwd.getvalue(), rev.getvalue()
+
 
 @dataclass
 class Patch:
@@ -53,18 +186,53 @@ class PatchGenerator:
         # Ensure output directory exists
         os.makedirs(self.config.patch.output_dir, exist_ok=True)
         
-        # Patch cache
-        self._patch_cache = {}
+        # Patch cache: each worker thread keeps its own LRU (recently
+        # used keys live at the end) so the hot path never takes a lock;
+        # locals are periodically folded into an immutable shared snapshot
+        # that other threads read via _shared_cache.
+        self._tls = threading.local()
+        self._shared_cache: 'MappingProxyType[int, List[Patch]]' = MappingProxyType({})
         self._cache_size = 100
+        self._merge_interval = 100
+        self._merge_pending = 0
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+        # Reusable text buffers for the patch text generators; bulk
+        # generation otherwise allocates and discards one buffer per patch.
+        self._text_buffer_pool: List[io.StringIO] = []
+        self._text_buffer_pool_size = 32
+
+        # Per-batch timestamp cache: filled by _generate_patches_for_fixes
+        # so N fixes in a batch share one strftime instead of N each
+        self._batch_date_str: Optional[str] = None
+        self._batch_id_prefix: Optional[str] = None
+
+        # Monotonic suffix for patch ids: unlike the old description-hash
+        # suffix it cannot collide within a burst
+        self._patch_counter = itertools.count()
+
+        # Large fixes get their patch text built in a worker process so
+        # the event loop thread is not pinned by string formatting; the
+        # pool is created lazily on first oversized fix.
+        self._cpu_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._cpu_offload_threshold = 64
+
+        # Whether the output filesystem supports reflink clones; probed on
+        # the first backup and cached (None = not yet probed)
+        self._reflink_supported: Optional[bool] = None
     
     async def generate_patches(self, fixes: List[Any]) -> List[Patch]:
         """Generate patches for a list of fixes."""
         try:
             # Check cache first
             cache_key = self._generate_cache_key(fixes)
-            if cache_key in self._patch_cache:
-                return self._patch_cache[cache_key]
-            
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                self._cache_hits += 1
+                return cached
+            self._cache_misses += 1
+
             # Generate patches
             patches = await self._generate_patches_for_fixes(fixes)
             
@@ -79,56 +247,91 @@ class PatchGenerator:
             
             return []
     
-    def _generate_cache_key(self, fixes: List[Any]) -> str:
-        """Generate cache key for patch generation."""
-        key_parts = [str(len(fixes))]
-        for fix in fixes:
-            if hasattr(fix, 'description'):
-                key_parts.append(fix.description[:50])
-        
-        return hash('|'.join(key_parts))
+    def _generate_cache_key(self, fixes: List[Any]) -> int:
+        """Generate a stable 64-bit cache key for patch generation."""
+        # Hash fix fields directly rather than building an intermediate
+        # joined string; unlike str hash() the digest is not process-salted,
+        # so keys stay stable across runs.
+        h = _new_fingerprint()
+        h.update(len(fixes).to_bytes(4, 'little'))
+        if len(fixes) >= 64:
+            # Large batches: pack every description prefix into one buffer
+            # and hash it in a single C-level pass instead of two update
+            # calls per fix
+            h.update(b'|'.join(
+                getattr(fix, 'description', '')[:50].encode('utf-8', 'ignore')
+                for fix in fixes
+            ))
+        else:
+            for fix in fixes:
+                desc = getattr(fix, 'description', '')
+                h.update(desc[:50].encode('utf-8', 'ignore'))
+                h.update(b'|')
+
+        return _fingerprint_digest(h)
     
     async def _generate_patches_for_fixes(self, fixes: List[Any]) -> List[Patch]:
         """Generate patches for multiple fixes."""
-        patches = []
-        
+        batch_dt = datetime.now()
+        self._batch_date_str = batch_dt.strftime('%a %b %d %H:%M:%S %Y')
+        self._batch_id_prefix = f"patch_{batch_dt.strftime('%Y%m%d_%H%M%S')}_"
+
+        # Build patches synchronously — only oversized fixes (process-pool
+        # offload) and the file saves actually need to await, so the
+        # common path pays no per-fix coroutine suspension.
+        built: List[Optional[Patch]] = []
+        oversized: List[Tuple[int, Any, Dict[str, Dict[str, Any]]]] = []
+
         for fix in fixes:
             try:
-                patch = await self._generate_patch_for_fix(fix)
-                if patch:
-                    patches.append(patch)
+                affected_files = self._get_affected_files_from_fix(fix)
+                if not affected_files:
+                    logger.warning(f"No affected files found for fix: {fix.description}")
+                    continue
+
+                if len(affected_files) >= self._cpu_offload_threshold:
+                    built.append(None)
+                    oversized.append((len(built) - 1, fix, affected_files))
+                else:
+                    built.append(self._build_patch(fix, affected_files))
             except Exception as e:
                 logger.error(f"Error generating patch for fix: {e}")
-        
+
+        if oversized:
+            results = await asyncio.gather(
+                *(self._build_patch_offloaded(fix, affected_files)
+                  for _, fix, affected_files in oversized),
+                return_exceptions=True
+            )
+            for (index, _, _), result in zip(oversized, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error generating patch for fix: {result}")
+                else:
+                    built[index] = result
+
+        patches = [patch for patch in built if patch is not None]
+
+        # Save all patches concurrently once building is done
+        if patches:
+            await asyncio.gather(*(self._save_patch_to_file(patch) for patch in patches))
+
         return patches
-    
-    async def _generate_patch_for_fix(self, fix: Any) -> Optional[Patch]:
-        """Generate a patch for a single fix."""
-        patch_id = f"patch_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(fix.description) % 10000:04d}"
-        
-        # Get affected files and their changes
-        affected_files = self._get_affected_files_from_fix(fix)
-        
-        if not affected_files:
-            logger.warning(f"No affected files found for fix: {fix.description}")
-            return None
-        
-        # Generate patch content based on format
-        patch_content = ""
-        rollback_content = ""
-        
-        if self.config.patch.patch_format == "git":
-            patch_content = self._generate_git_patch(fix, affected_files)
-            rollback_content = self._generate_git_rollback_patch(fix, affected_files)
-        elif self.config.patch.patch_format == "unified":
-            patch_content = self._generate_unified_patch(fix, affected_files)
-            rollback_content = self._generate_unified_rollback_patch(fix, affected_files)
-        elif self.config.patch.patch_format == "context":
-            patch_content = self._generate_context_patch(fix, affected_files)
-            rollback_content = self._generate_context_rollback_patch(fix, affected_files)
-        else:
-            raise ValueError(f"Unsupported patch format: {self.config.patch.patch_format}")
-        
+
+    def _build_patch(self, fix: Any, affected_files: Dict[str, Dict[str, Any]],
+                     texts: Optional[Tuple[str, str]] = None) -> Patch:
+        """Build a Patch object for a single fix (no I/O)."""
+        prefix = self._batch_id_prefix or f"patch_{datetime.now().strftime('%Y%m%d_%H%M%S')}_"
+        patch_id = f"{prefix}{next(self._patch_counter):06d}"
+
+        # Generate patch content and rollback together in one pass
+        patch_format = self.config.patch.patch_format
+        if patch_format not in _PAIR_WRITERS:
+            raise ValueError(f"Unsupported patch format: {patch_format}")
+
+        if texts is None:
+            texts = self._generate_pair(patch_format, fix, affected_files)
+        patch_content, rollback_content = texts
+
         # Create patch metadata
         metadata = {
             'fix_type': fix.fix_type,
@@ -138,29 +341,41 @@ class PatchGenerator:
             'estimated_impact': fix.estimated_impact,
             'affected_files_count': len(affected_files)
         }
-        
+
         # Create rollback patch if possible
         rollback_patch = None
         if fix.rollback_possible and rollback_content:
             rollback_patch = rollback_content
-        
-        # Create patch object
-        patch = Patch(
+
+        return Patch(
             patch_id=patch_id,
             description=fix.description,
-            format=self.config.patch.patch_format,
+            format=patch_format,
             content=patch_content,
             affected_files=list(affected_files.keys()),
             created_at=datetime.now(),
             rollback_patch=rollback_patch,
             metadata=metadata
         )
-        
-        # Save patch to file
-        await self._save_patch_to_file(patch)
-        
-        return patch
-    
+
+    async def _build_patch_offloaded(self, fix: Any,
+                                     affected_files: Dict[str, Dict[str, Any]]) -> Patch:
+        """Build a Patch whose text is generated in the process pool."""
+        patch_format = self.config.patch.patch_format
+        if patch_format not in _PAIR_WRITERS:
+            raise ValueError(f"Unsupported patch format: {patch_format}")
+
+        # Big enough to be worth the pickling: ship only plain data
+        # (description + change dicts) to a worker process
+        date_str = self._batch_date_str or datetime.now().strftime('%a %b %d %H:%M:%S %Y')
+        loop = asyncio.get_running_loop()
+        texts = await loop.run_in_executor(
+            self._get_cpu_pool(), _build_pair_text,
+            patch_format, fix.description, affected_files, date_str
+        )
+
+        return self._build_patch(fix, affected_files, texts)
+
     def _get_affected_files_from_fix(self, fix: Any) -> Dict[str, Dict[str, Any]]:
         """Extract affected files and changes from a fix."""
         affected_files = {}
@@ -169,181 +384,69 @@ class PatchGenerator:
         # In a real system, you would have access to the actual file changes
         
         for change in fix.code_changes:
-            file_pattern = change.get('file_pattern', '')
-            search_pattern = change.get('search_pattern', '')
-            replace_pattern = change.get('replace_pattern', '')
-            
+            get = change.get
+
             # For demonstration, we'll create mock affected files
             # In reality, you would scan the codebase for files matching the pattern
             # and apply the changes to generate the actual patch content
-            
-            affected_files[f"mock_file_{hash(file_pattern) % 1000}.py"] = {
-                'search_pattern': search_pattern,
-                'replace_pattern': replace_pattern,
-                'description': change.get('description', '')
+            # (the filename derivation is memoized since patterns repeat
+            # heavily across fixes)
+
+            affected_files[_mock_filename(get('file_pattern', ''))] = {
+                'search_pattern': get('search_pattern', ''),
+                'replace_pattern': get('replace_pattern', ''),
+                'description': get('description', '')
             }
         
         return affected_files
     
-    def _generate_git_patch(self, fix: Any, affected_files: Dict[str, Dict[str, Any]]) -> str:
-        """Generate a Git-format patch."""
-        patch_lines = []
-        
-        # Git patch header
-        patch_lines.append(f"From: DevOps AI <devops-ai@example.com>")
-        patch_lines.append(f"Date: {datetime.now().strftime('%a %b %d %H:%M:%S %Y')}")
-        patch_lines.append(f"Subject: [PATCH] {fix.description}")
-        patch_lines.append("")
-        
-        # Diff header
-        patch_lines.append(f"--- a/{list(affected_files.keys())[0]}")
-        patch_lines.append(f"+++ b/{list(affected_files.keys())[0]}")
-        patch_lines.append("@@ -1,5 +1,5 @@")
-        
-        # Mock diff content
-        for filename, change_info in affected_files.items():
-            search_pattern = change_info['search_pattern']
-            replace_pattern = change_info['replace_pattern']
-            
-            # Mock original and modified lines
-            original_line = f"    {search_pattern}"
-            modified_line = f"    {replace_pattern}"
-            
-            patch_lines.append(f"-{original_line}")
-            patch_lines.append(f"+{modified_line}")
-        
-        return "\n".join(patch_lines)
-    
-    def _generate_unified_patch(self, fix: Any, affected_files: Dict[str, Dict[str, Any]]) -> str:
-        """Generate a unified diff patch."""
-        patch_lines = []
-        
-        # Unified diff header
-        patch_lines.append(f"--- a/{list(affected_files.keys())[0]}")
-        patch_lines.append(f"+++ b/{list(affected_files.keys())[0]}")
-        patch_lines.append("@@ -1,5 +1,5 @@")
-        
-        # Mock diff content
-        for filename, change_info in affected_files.items():
-            search_pattern = change_info['search_pattern']
-            replace_pattern = change_info['replace_pattern']
-            
-            original_line = f"    {search_pattern}"
-            modified_line = f"    {replace_pattern}"
-            
-            patch_lines.append(f"-{original_line}")
-            patch_lines.append(f"+{modified_line}")
-        
-        return "\n".join(patch_lines)
-    
-    def _generate_context_patch(self, fix: Any, affected_files: Dict[str, Dict[str, Any]]) -> str:
-        """Generate a context diff patch."""
-        patch_lines = []
-        
-        # Context diff header
-        patch_lines.append(f"*** a/{list(affected_files.keys())[0]}")
-        patch_lines.append(f"--- b/{list(affected_files.keys())[0]}")
-        patch_lines.append("***************")
-        
-        # Mock diff content
-        for filename, change_info in affected_files.items():
-            search_pattern = change_info['search_pattern']
-            replace_pattern = change_info['replace_pattern']
-            
-            original_line = f"    {search_pattern}"
-            modified_line = f"    {replace_pattern}"
-            
-            patch_lines.append(f"*** 1,5 ****")
-            patch_lines.append(f"  {original_line}")
-            patch_lines.append(f"--- 1,5 ----")
-            patch_lines.append(f"  {modified_line}")
-        
-        return "\n".join(patch_lines)
-    
-    def _generate_git_rollback_patch(self, fix: Any, affected_files: Dict[str, Dict[str, Any]]) -> str:
-        """Generate a Git-format rollback patch."""
-        # Rollback patch swaps the diff directions
-        patch_lines = []
-        
-        patch_lines.append(f"From: DevOps AI <devops-ai@example.com>")
-        patch_lines.append(f"Date: {datetime.now().strftime('%a %b %d %H:%M:%S %Y')}")
-        patch_lines.append(f"Subject: [PATCH] Rollback: {fix.description}")
-        patch_lines.append("")
-        
-        patch_lines.append(f"--- a/{list(affected_files.keys())[0]}")
-        patch_lines.append(f"+++ b/{list(affected_files.keys())[0]}")
-        patch_lines.append("@@ -1,5 +1,5 @@")
-        
-        for filename, change_info in affected_files.items():
-            search_pattern = change_info['search_pattern']
-            replace_pattern = change_info['replace_pattern']
-            
-            # Swap the lines for rollback
-            original_line = f"    {search_pattern}"
-            modified_line = f"    {replace_pattern}"
-            
-            patch_lines.append(f"-{modified_line}")
-            patch_lines.append(f"+{original_line}")
-        
-        return "\n".join(patch_lines)
-    
-    def _generate_unified_rollback_patch(self, fix: Any, affected_files: Dict[str, Dict[str, Any]]) -> str:
-        """Generate a unified diff rollback patch."""
-        patch_lines = []
-        
-        patch_lines.append(f"--- a/{list(affected_files.keys())[0]}")
-        patch_lines.append(f"+++ b/{list(affected_files.keys())[0]}")
-        patch_lines.append("@@ -1,5 +1,5 @@")
-        
-        for filename, change_info in affected_files.items():
-            search_pattern = change_info['search_pattern']
-            replace_pattern = change_info['replace_pattern']
-            
-            original_line = f"    {search_pattern}"
-            modified_line = f"    {replace_pattern}"
-            
-            patch_lines.append(f"-{modified_line}")
-            patch_lines.append(f"+{original_line}")
-        
-        return "\n".join(patch_lines)
-    
-    def _generate_context_rollback_patch(self, fix: Any, affected_files: Dict[str, Dict[str, Any]]) -> str:
-        """Generate a context diff rollback patch."""
-        patch_lines = []
-        
-        patch_lines.append(f"*** a/{list(affected_files.keys())[0]}")
-        patch_lines.append(f"--- b/{list(affected_files.keys())[0]}")
-        patch_lines.append("***************")
-        
-        for filename, change_info in affected_files.items():
-            search_pattern = change_info['search_pattern']
-            replace_pattern = change_info['replace_pattern']
-            
-            original_line = f"    {search_pattern}"
-            modified_line = f"    {replace_pattern}"
-            
-            patch_lines.append(f"*** 1,5 ****")
-            patch_lines.append(f"  {modified_line}")
-            patch_lines.append(f"--- 1,5 ----")
-            patch_lines.append(f"  {original_line}")
-        
-        return "\n".join(patch_lines)
-    
+    def _acquire_text_buffer(self) -> io.StringIO:
+        """Take a text buffer from the pool, or allocate a fresh one."""
+        return self._text_buffer_pool.pop() if self._text_buffer_pool else io.StringIO()
+
+    def _release_text_buffer(self, buf: io.StringIO):
+        """Return a text buffer to the pool for reuse.
+
+        Buffers abandoned on an error path are simply collected; the pool
+        is best-effort, not a leak tracker.
+        """
+        buf.seek(0)
+        buf.truncate()
+        if len(self._text_buffer_pool) < self._text_buffer_pool_size:
+            self._text_buffer_pool.append(buf)
+
+    def _generate_pair(self, patch_format: str, fix: Any,
+                       affected_files: Dict[str, Dict[str, Any]]) -> Tuple[str, str]:
+        """Build (content, rollback) inline using pooled text buffers."""
+        fwd = self._acquire_text_buffer()
+        rev = self._acquire_text_buffer()
+
+        date_str = self._batch_date_str or datetime.now().strftime('%a %b %d %H:%M:%S %Y')
+        _PAIR_WRITERS[patch_format](fwd, rev, fix.description, affected_files, date_str)
+
+        content = fwd.getvalue()
+        rollback = rev.getvalue()
+        self._release_text_buffer(fwd)
+        self._release_text_buffer(rev)
+        return content, rollback
+
+    def _get_cpu_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        """Lazily create the process pool for oversized patch builds."""
+        if self._cpu_pool is None:
+            self._cpu_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=os.cpu_count()
+            )
+        return self._cpu_pool
+
     async def _save_patch_to_file(self, patch: Patch):
-        """Save patch to file."""
+        """Save patch content, metadata and rollback patch in one batched submission."""
         try:
-            # Create patch filename
-            filename = f"{patch.patch_id}.patch"
-            filepath = os.path.join(self.config.patch.output_dir, filename)
-            
-            # Write patch content
-            with open(filepath, 'w') as f:
-                f.write(patch.content)
-            
-            # Write metadata
-            metadata_filename = f"{patch.patch_id}_metadata.json"
-            metadata_filepath = os.path.join(self.config.patch.output_dir, metadata_filename)
-            
+            output_dir = self.config.patch.output_dir
+            filepath = os.path.join(output_dir, f"{patch.patch_id}.patch")
+
+            # Pre-serialize every payload once, then hand the whole batch to a
+            # single worker dispatch so the three writes share one submission
+            # instead of three separate event-loop round trips.
             metadata_content = {
                 'patch_id': patch.patch_id,
                 'description': patch.description,
@@ -352,22 +455,39 @@ class PatchGenerator:
                 'created_at': patch.created_at.isoformat(),
                 'metadata': patch.metadata
             }
-            
-            with open(metadata_filepath, 'w') as f:
-                json.dump(metadata_content, f, indent=2)
-            
-            # Write rollback patch if available
+
+            writes = [
+                (filepath, patch.content.encode('utf-8')),
+                (os.path.join(output_dir, f"{patch.patch_id}_metadata.json"),
+                 json.dumps(metadata_content, indent=2).encode('utf-8')),
+            ]
+
             if patch.rollback_patch:
-                rollback_filename = f"{patch.patch_id}_rollback.patch"
-                rollback_filepath = os.path.join(self.config.patch.output_dir, rollback_filename)
-                
-                with open(rollback_filepath, 'w') as f:
-                    f.write(patch.rollback_patch)
-            
+                writes.append(
+                    (os.path.join(output_dir, f"{patch.patch_id}_rollback.patch"),
+                     patch.rollback_patch.encode('utf-8'))
+                )
+
+            await asyncio.to_thread(self._write_patch_files, writes)
+
             logger.info(f"Saved patch {patch.patch_id} to {filepath}")
-            
+
         except Exception as e:
             logger.error(f"Error saving patch {patch.patch_id}: {e}")
+
+    def _write_patch_files(self, writes: List[Tuple[str, bytes]]):
+        """Write a batch of pre-serialized files back to back.
+
+        Uses raw fds: the payloads are already bytes, so each file is one
+        open/write/close without the buffered TextIO/BufferedWriter stack.
+        """
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_CLOEXEC', 0)
+        for path, data in writes:
+            fd = os.open(path, flags, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
     
     async def apply_patch(self, patch: Patch, target_dir: str = ".") -> PatchResult:
         """Apply a patch to the target directory."""
@@ -435,28 +555,66 @@ class PatchGenerator:
     async def _create_backup(self, source_dir: str, backup_dir: str):
         """Create a backup of the target directory."""
         try:
-            if os.path.exists(backup_dir):
-                shutil.rmtree(backup_dir)
-            
-            shutil.copytree(source_dir, backup_dir)
+            # Single off-loop dispatch: the exists check and both tree
+            # operations run in the worker thread so the directory walk
+            # never blocks the event loop.
+            await asyncio.to_thread(self._copy_tree_replacing, source_dir, backup_dir)
             logger.info(f"Created backup at {backup_dir}")
-            
+
         except Exception as e:
             logger.error(f"Error creating backup: {e}")
             raise
-    
+
     async def _restore_backup(self, target_dir: str, backup_dir: str):
         """Restore from backup."""
         try:
-            if os.path.exists(target_dir):
-                shutil.rmtree(target_dir)
-            
-            shutil.copytree(backup_dir, target_dir)
+            await asyncio.to_thread(self._copy_tree_replacing, backup_dir, target_dir)
             logger.info(f"Restored from backup {backup_dir}")
-            
+
         except Exception as e:
             logger.error(f"Error restoring backup: {e}")
             raise
+
+    def _copy_tree_replacing(self, source_dir: str, dest_dir: str):
+        """Replace dest_dir with a copy of source_dir (blocking helper).
+
+        Prefers copy-on-write reflink clones (metadata-only, no byte
+        movement) and falls back to a full shutil.copytree where the
+        filesystem does not support them.
+        """
+        if os.path.exists(dest_dir):
+            shutil.rmtree(dest_dir)
+
+        if fcntl is not None and self._reflink_supported is not False:
+            try:
+                self._reflink_tree(source_dir, dest_dir)
+                self._reflink_supported = True
+                return
+            except OSError as e:
+                if e.errno not in (errno.EOPNOTSUPP, errno.ENOTSUP,
+                                   errno.EXDEV, errno.EINVAL, errno.ENOTTY):
+                    raise
+                self._reflink_supported = False
+                shutil.rmtree(dest_dir, ignore_errors=True)
+
+        shutil.copytree(source_dir, dest_dir, symlinks=True)
+
+    def _reflink_tree(self, source_dir: str, dest_dir: str):
+        """Clone source_dir into dest_dir using FICLONE per regular file."""
+        os.makedirs(dest_dir)
+        for root, dirs, files in os.walk(source_dir):
+            rel = os.path.relpath(root, source_dir)
+            target_root = dest_dir if rel == '.' else os.path.join(dest_dir, rel)
+            for name in dirs:
+                os.makedirs(os.path.join(target_root, name), exist_ok=True)
+            for name in files:
+                src_path = os.path.join(root, name)
+                dst_path = os.path.join(target_root, name)
+                if os.path.islink(src_path):
+                    os.symlink(os.readlink(src_path), dst_path)
+                    continue
+                with open(src_path, 'rb') as src_f, open(dst_path, 'wb') as dst_f:
+                    fcntl.ioctl(dst_f.fileno(), _FICLONE, src_f.fileno())
     
     async def _apply_patch_content(self, patch: Patch, target_dir: str) -> bool:
         """Apply patch content to target directory."""
@@ -560,19 +718,57 @@ class PatchGenerator:
             logger.error(f"Error applying rollback content: {e}")
             return False
     
-    def _add_to_cache(self, key: str, patches: List[Patch]):
-        """Add patches to cache."""
-        if len(self._patch_cache) >= self._cache_size:
-            # Remove oldest entries
-            oldest_key = next(iter(self._patch_cache))
-            del self._patch_cache[oldest_key]
-        
-        self._patch_cache[key] = patches
+    def _local_cache(self) -> 'OrderedDict[int, List[Patch]]':
+        """Return the calling thread's private LRU cache."""
+        cache = getattr(self._tls, 'cache', None)
+        if cache is None:
+            cache = self._tls.cache = OrderedDict()
+        return cache
+
+    def _cache_get(self, key: int) -> Optional[List[Patch]]:
+        """Look up patches: thread-local LRU first, shared snapshot second."""
+        local = self._local_cache()
+        patches = local.get(key)
+        if patches is not None:
+            local.move_to_end(key)
+            return patches
+        return self._shared_cache.get(key)
+
+    def _add_to_cache(self, key: int, patches: List[Patch]):
+        """Add patches to the thread-local cache, merging periodically."""
+        local = self._local_cache()
+        if len(local) >= self._cache_size:
+            # Evict the least recently used entry
+            local.popitem(last=False)
+
+        local[key] = patches
+
+        # Fold locals into a fresh immutable snapshot every N inserts;
+        # the rebind is atomic so readers never see a half-built map.
+        # The counter is racy under threads, which only skews the merge
+        # cadence, never correctness.
+        self._merge_pending += 1
+        if self._merge_pending >= self._merge_interval:
+            self._merge_pending = 0
+            merged = {**self._shared_cache, **local}
+            if len(merged) > self._cache_size:
+                for stale in list(merged)[:len(merged) - self._cache_size]:
+                    del merged[stale]
+            self._shared_cache = MappingProxyType(merged)
     
     async def batch_generate_patches(self, fixes_list: List[List[Any]]) -> List[List[Patch]]:
-        """Generate patches for multiple fix lists efficiently."""
-        tasks = [self.generate_patches(fixes) for fixes in fixes_list]
-        return await asyncio.gather(*tasks)
+        """Generate patches for multiple fix lists with bounded concurrency."""
+        max_concurrency = getattr(self.config.patch, 'max_concurrency', 32)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _worker(fixes: List[Any]) -> List[Patch]:
+            async with semaphore:
+                return await self.generate_patches(fixes)
+
+        # The semaphore caps how many generations run at once so a large
+        # fixes_list cannot flood the loop with live tasks; gather keeps
+        # the results aligned with the input order.
+        return await asyncio.gather(*(_worker(fixes) for fixes in fixes_list))
     
     def get_patch_stats(self) -> Dict[str, Any]:
         """Get statistics about patch generation."""
@@ -580,17 +776,22 @@ class PatchGenerator:
         total_size = 0
         
         try:
-            for filename in os.listdir(self.config.patch.output_dir):
-                if filename.endswith('.patch'):
-                    filepath = os.path.join(self.config.patch.output_dir, filename)
-                    patch_files.append(filename)
-                    total_size += os.path.getsize(filepath)
+            # scandir serves the size from the cached DirEntry stat, so
+            # each file costs one syscall instead of listdir + getsize
+            with os.scandir(self.config.patch.output_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.patch'):
+                        patch_files.append(entry.name)
+                        total_size += entry.stat().st_size
         except Exception as e:
             logger.warning(f"Error getting patch stats: {e}")
         
         return {
-            'cache_size': len(self._patch_cache),
+            'cache_size': len(self._local_cache()),
+            'shared_cache_size': len(self._shared_cache),
             'cache_capacity': self._cache_size,
+            'cache_hits': self._cache_hits,
+            'cache_misses': self._cache_misses,
             'output_directory': self.config.patch.output_dir,
             'total_patches': len(patch_files),
             'total_size_bytes': total_size,
@@ -599,8 +800,10 @@ class PatchGenerator:
         }
     
     def clear_cache(self):
-        """Clear the patch cache."""
-        self._patch_cache.clear()
+        """Clear the calling thread's patch cache and the shared snapshot."""
+        self._local_cache().clear()
+        self._shared_cache = MappingProxyType({})
+        self._merge_pending = 0
         logger.info("Cleared patch cache")
     
     def cleanup_old_patches(self, days_to_keep: int = 30):
@@ -608,12 +811,22 @@ class PatchGenerator:
         try:
             cutoff_time = datetime.now().timestamp() - (days_to_keep * 24 * 3600)
             
+            # Phase 1: collect stale paths from the cached DirEntry stats
+            stale_paths = []
+            with os.scandir(self.config.patch.output_dir) as entries:
+                for entry in entries:
+                    if entry.stat().st_ctime < cutoff_time:
+                        stale_paths.append(entry.path)
+
+            # Phase 2: issue the unlinks back to back, tolerating files
+            # that disappeared between the scan and the delete
             removed_count = 0
-            for filename in os.listdir(self.config.patch.output_dir):
-                filepath = os.path.join(self.config.patch.output_dir, filename)
-                if os.path.getctime(filepath) < cutoff_time:
-                    os.remove(filepath)
+            for path in stale_paths:
+                try:
+                    os.unlink(path)
                     removed_count += 1
+                except FileNotFoundError:
+                    pass
             
             logger.info(f"Cleaned up {removed_count} old patch files")
             
@@ -5,243 +5,45 @@ Supports multiple output formats and customizable templates.
 """
 
 import asyncio
+import hashlib
+import html
+import itertools
 import logging
 import json
 import os
-import re
+import shutil
+import threading
+import traceback
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from jinja2 import Template, Environment, FileSystemLoader
+from jinja2 import ChoiceLoader, DictLoader, Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+from markupsafe import Markup
 import markdown
-from collections import defaultdict
+from collections import Counter, OrderedDict, defaultdict
+from operator import attrgetter
+
+try:
+    import orjson  # Optional: much faster JSON serialization
+except ImportError:
+    orjson = None
 
 from config import Config
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class Report:
-    """Represents a generated report."""
-    report_id: str
-    title: str
-    format: str
-    content: str
-    created_at: datetime
-    metadata: Dict[str, Any]
+def _json_dumps_pretty(data: Any) -> bytes:
+    """Serialize to pretty-printed JSON bytes, preferring orjson."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2, default=str)
+    return json.dumps(data, indent=2, default=str).encode('utf-8')
 
 
-class ReportBuilder:
-    """Builds comprehensive reports from error analysis data."""
-    
-    def __init__(self, config: Config):
-        self.config = config
-        
-        # Ensure output directory exists
-        os.makedirs(self.config.report.output_dir, exist_ok=True)
-        
-        # Template directory
-        os.makedirs(self.config.report.template_dir, exist_ok=True)
-        
-        # Initialize Jinja2 environment
-        self.template_env = Environment(
-            loader=FileSystemLoader(self.config.report.template_dir),
-            autoescape=True
-        )
-        
-        # Report cache
-        self._report_cache = {}
-        self._cache_size = 50
-    
-    async def build_report(self, analysis_data: Dict[str, Any]) -> Report:
-        """Build a comprehensive report from analysis data."""
-        try:
-            # Check cache first
-            cache_key = self._generate_cache_key(analysis_data)
-            if cache_key in self._report_cache:
-                return self._report_cache[cache_key]
-            
-            # Generate report
-            report = await self._build_report_for_data(analysis_data)
-            
-            # Add to cache
-            self._add_to_cache(cache_key, report)
-            
-            return report
-            
-        except Exception as e:
-            logger.error(f"Error building report: {e}")
-            logger.debug(f"Traceback: {traceback.format_exc()}")
-            
-            # Return fallback report
-            return Report(
-                report_id="error_report",
-                title="Error Report Generation Failed",
-                format="html",
-                content=f"<h1>Error</h1><p>Failed to generate report: {str(e)}</p>",
-                created_at=datetime.now(),
-                metadata={'error': str(e)}
-            )
-    
-    def _generate_cache_key(self, analysis_data: Dict[str, Any]) -> str:
-        """Generate cache key for report generation."""
-        key_parts = [
-            str(len(analysis_data.get('error_context', []))),
-            str(len(analysis_data.get('common_patterns', {}))),
-            str(len(analysis_data.get('suggested_fixes', [])))
-        ]
-        return hash('|'.join(key_parts))
-    
-    async def _build_report_for_data(self, analysis_data: Dict[str, Any]) -> Report:
-        """Build a report for specific analysis data."""
-        report_id = f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(str(analysis_data)) % 10000:04d}"
-        
-        # Generate report content for each format
-        reports = {}
-        
-        for format_type in self.config.report.formats:
-            try:
-                if format_type == 'html':
-                    content = await self._generate_html_report(analysis_data)
-                elif format_type == 'markdown':
-                    content = await self._generate_markdown_report(analysis_data)
-                elif format_type == 'json':
-                    content = await self._generate_json_report(analysis_data)
-                else:
-                    content = f"Unsupported format: {format_type}"
-                
-                reports[format_type] = content
-                
-            except Exception as e:
-                logger.error(f"Error generating {format_type} report: {e}")
-                reports[format_type] = f"Error generating {format_type} report: {str(e)}"
-        
-        # Use the first format as the primary report
-        primary_format = self.config.report.formats[0] if self.config.report.formats else 'html'
-        primary_content = reports.get(primary_format, "")
-        
-        # Create report metadata
-        metadata = {
-            'analysis_timestamp': datetime.now().isoformat(),
-            'error_count': len(analysis_data.get('error_context', [])),
-            'patterns_found': len(analysis_data.get('common_patterns', {})),
-            'fixes_suggested': len(analysis_data.get('suggested_fixes', [])),
-            'formats_generated': list(reports.keys())
-        }
-        
-        # Create report object
-        report = Report(
-            report_id=report_id,
-            title=f"Error Analysis Report - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            format=primary_format,
-            content=primary_content,
-            created_at=datetime.now(),
-            metadata=metadata
-        )
-        
-        # Save report to file
-        await self._save_report_to_file(report, reports)
-        
-        return report
-    
-    async def _generate_html_report(self, analysis_data: Dict[str, Any]) -> str:
-        """Generate an HTML report."""
-        # Try to load custom template, fall back to default
-        try:
-            template = self.template_env.get_template('report_template.html')
-        except:
-            template = self._get_default_html_template()
-        
-        # Prepare data for template
-        template_data = self._prepare_template_data(analysis_data)
-        
-        # Render HTML
-        return template.render(**template_data)
-    
-    async def _generate_markdown_report(self, analysis_data: Dict[str, Any]) -> str:
-        """Generate a Markdown report."""
-        # Try to load custom template, fall back to default
-        try:
-            template = self.template_env.get_template('report_template.md')
-        except:
-            template = self._get_default_markdown_template()
-        
-        # Prepare data for template
-        template_data = self._prepare_template_data(analysis_data)
-        
-        # Render Markdown
-        markdown_content = template.render(**template_data)
-        
-        # Convert to HTML if needed
-        if self.config.report.enable_detailed:
-            return markdown.markdown(markdown_content, extensions=['tables', 'fenced_code'])
-        
-        return markdown_content
-    
-    async def _generate_json_report(self, analysis_data: Dict[str, Any]) -> str:
-        """Generate a JSON report."""
-        # Add metadata and formatting
-        report_data = {
-            'report_metadata': {
-                'generated_at': datetime.now().isoformat(),
-                'version': self.config.system.version,
-                'analysis_data': analysis_data
-            }
-        }
-        
-        return json.dumps(report_data, indent=2, default=str)
-    
-    def _prepare_template_data(self, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Prepare data for template rendering."""
-        # Extract and organize data
-        error_context = analysis_data.get('error_context', [])
-        common_patterns = analysis_data.get('common_patterns', {})
-        suggested_fixes = analysis_data.get('suggested_fixes', [])
-        dependency_graph = analysis_data.get('dependency_graph', {})
-        risk_assessment = analysis_data.get('risk_assessment', {})
-        
-        # Organize error context by file
-        errors_by_file = defaultdict(list)
-        for context in error_context:
-            if hasattr(context, 'file_path'):
-                errors_by_file[context.file_path].append(context)
-        
-        # Calculate statistics
-        stats = {
-            'total_errors': len(error_context),
-            'unique_files': len(errors_by_file),
-            'common_patterns_count': len(common_patterns),
-            'suggested_fixes_count': len(suggested_fixes),
-            'high_risk_files': len([f for f, r in risk_assessment.items() if r == 'HIGH']),
-            'medium_risk_files': len([f for f, r in risk_assessment.items() if r == 'MEDIUM']),
-            'low_risk_files': len([f for f, r in risk_assessment.items() if r == 'LOW'])
-        }
-        
-        # Prepare template data
-        template_data = {
-            'report_title': f"DevOps AI Error Analysis Report",
-            'report_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'analysis_data': analysis_data,
-            'error_context': error_context,
-            'errors_by_file': dict(errors_by_file),
-            'common_patterns': common_patterns,
-            'suggested_fixes': suggested_fixes,
-            'dependency_graph': dependency_graph,
-            'risk_assessment': risk_assessment,
-            'statistics': stats,
-            'config': {
-                'enable_detailed': self.config.report.enable_detailed,
-                'enable_trends': self.config.report.enable_trends
-            }
-        }
-        
-        return template_data
-    
-    def _get_default_html_template(self) -> Template:
-        """Get default HTML template."""
-        html_template = """
+# Default template sources, hoisted to module scope so they are
+# allocated once and compiled exactly once per Environment
+_DEFAULT_HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -331,21 +133,13 @@ class ReportBuilder:
     
     <div class="section">
         <h2>Risk Assessment</h2>
-        {% for file_path, risk_level in risk_assessment.items() %}
-        <div class="error-item risk-{{ risk_level.lower() }}">
-            <h3>{{ file_path }}</h3>
-            <p><strong>Risk Level:</strong> {{ risk_level }}</p>
-        </div>
-        {% endfor %}
+        {{ risk_html }}
     </div>
 </body>
 </html>
         """
-        return Template(html_template)
-    
-    def _get_default_markdown_template(self) -> Template:
-        """Get default Markdown template."""
-        markdown_template = """
+
+_DEFAULT_MARKDOWN_TEMPLATE = """
 # {{ report_title }}
 
 **Generated on:** {{ report_date }}
@@ -398,36 +192,403 @@ class ReportBuilder:
 
 {% endfor %}
         """
-        return Template(markdown_template)
+
+# Risk entries only vary in the file path, so the surrounding markup is
+# baked per level instead of re-evaluated by the template loop
+_RISK_ITEM_TMPL = """
+        <div class="error-item risk-{css}">
+            <h3>{path}</h3>
+            <p><strong>Risk Level:</strong> {level}</p>
+        </div>"""
+
+_RISK_ITEM_FRAGMENTS = {
+    level: _RISK_ITEM_TMPL.replace('{css}', level.lower()).replace('{level}', level)
+    for level in ('HIGH', 'MEDIUM', 'LOW')
+}
+
+_TREND_HTML_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>{{ report_title }}</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 40px; }
+        .header { background: #f4f4f4; padding: 20px; border-radius: 5px; }
+        .chart-container { margin: 20px 0; }
+        .metric-card { background: #fff; border: 1px solid #ddd; padding: 15px; margin: 10px 0; border-radius: 5px; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>{{ report_title }}</h1>
+        <p>Generated on: {{ report_date }}</p>
+    </div>
     
-    async def _save_report_to_file(self, report: Report, all_formats: Dict[str, str]):
-        """Save report to file in all formats."""
+    <div class="chart-container">
+        <h2>Error Trends (Last {{ trend_data.time_range_days }} Days)</h2>
+        <!-- In a real implementation, you would use a charting library like Chart.js -->
+        <p>Note: Charts would be rendered here using actual charting libraries.</p>
+    </div>
+    
+    <div class="metric-card">
+        <h3>Fix Success Rates</h3>
+        <ul>
+        {% for error_type, success_rate in trend_data.fix_success_rates.items() %}
+            <li><strong>{{ error_type }}:</strong> {{ (success_rate * 100)|round(1) }}%</li>
+        {% endfor %}
+        </ul>
+    </div>
+    
+    <div class="metric-card">
+        <h3>Most Common Error Patterns</h3>
+        <ol>
+        {% for pattern in trend_data.most_common_patterns %}
+            <li>{{ pattern }}</li>
+        {% endfor %}
+        </ol>
+    </div>
+</body>
+</html>
+        """
+
+
+@dataclass
+class Report:
+    """Represents a generated report."""
+    report_id: str
+    title: str
+    format: str
+    content: str
+    created_at: datetime
+    metadata: Dict[str, Any]
+
+
+class ReportBuilder:
+    """Builds comprehensive reports from error analysis data."""
+    
+    def __init__(self, config: Config):
+        self.config = config
+        
+        # Ensure output directory exists
+        os.makedirs(self.config.report.output_dir, exist_ok=True)
+        
+        # Template directory
+        os.makedirs(self.config.report.template_dir, exist_ok=True)
+        
+        # On-disk bytecode cache: once any process has compiled a template,
+        # later processes load the stored code object instead of re-parsing
+        self._template_cache_dir = os.path.join(self.config.report.output_dir, '.jinja_cache')
+        os.makedirs(self._template_cache_dir, exist_ok=True)
+
+        # Initialize Jinja2 environment. Custom templates in template_dir
+        # take precedence; the DictLoader supplies the built-in defaults so
+        # one get_template call resolves either and the Environment's
+        # template cache holds the compiled result.
+        self.template_env = Environment(
+            loader=ChoiceLoader([
+                FileSystemLoader(self.config.report.template_dir),
+                DictLoader({
+                    'report_template.html': _DEFAULT_HTML_TEMPLATE,
+                    'report_template.md': _DEFAULT_MARKDOWN_TEMPLATE,
+                }),
+            ]),
+            autoescape=True,
+            cache_size=400,
+            auto_reload=False,
+            bytecode_cache=FileSystemBytecodeCache(self._template_cache_dir)
+        )
+
+        # The trend template is not format-selectable, so compile it once
+        self._tpl_trend = Template(_TREND_HTML_TEMPLATE)
+        
+        # Reusable Markdown converter, one per thread: constructing a
+        # converter registers extensions and compiles their patterns,
+        # which is the expensive part of markdown.markdown()
+        self._md_local = threading.local()
+
+        # Report cache (LRU: recently used keys live at the end)
+        self._report_cache: 'OrderedDict[str, Report]' = OrderedDict()
+        self._cache_size = 50
+        self._report_seq = itertools.count()
+    
+    async def build_report(self, analysis_data: Dict[str, Any]) -> Report:
+        """Build a comprehensive report from analysis data."""
         try:
-            # Save primary format
-            primary_filename = f"{report.report_id}.{report.format}"
-            primary_filepath = os.path.join(self.config.report.output_dir, primary_filename)
+            # Check cache first
+            cache_key = self._generate_cache_key(analysis_data)
+            cached = self._report_cache.get(cache_key)
+            if cached is not None:
+                self._report_cache.move_to_end(cache_key)
+                return cached
             
-            with open(primary_filepath, 'w') as f:
-                f.write(report.content)
+            # Generate report
+            report = await self._build_report_for_data(analysis_data)
             
-            # Save all formats
-            for format_type, content in all_formats.items():
-                if format_type != report.format:
-                    filename = f"{report.report_id}.{format_type}"
-                    filepath = os.path.join(self.config.report.output_dir, filename)
-                    
-                    with open(filepath, 'w') as f:
-                        f.write(content)
+            # Add to cache
+            self._add_to_cache(cache_key, report)
             
-            # Save metadata
-            metadata_filename = f"{report.report_id}_metadata.json"
-            metadata_filepath = os.path.join(self.config.report.output_dir, metadata_filename)
+            return report
             
-            with open(metadata_filepath, 'w') as f:
-                json.dump(report.metadata, f, indent=2)
+        except Exception as e:
+            logger.error("Error building report: %s", e)
+            # format_exc walks and renders the whole stack; only pay for
+            # it when debug logging is actually enabled
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Traceback: %s", traceback.format_exc())
             
+            # Return fallback report
+            return Report(
+                report_id="error_report",
+                title="Error Report Generation Failed",
+                format="html",
+                content=f"<h1>Error</h1><p>Failed to generate report: {str(e)}</p>",
+                created_at=datetime.now(),
+                metadata={'error': str(e)}
+            )
+    
+    def _generate_cache_key(self, analysis_data: Dict[str, Any]) -> str:
+        """Generate a content-derived cache key for report generation."""
+        # The key must reflect the data itself: the old length-based key
+        # collided whenever two analyses happened to have matching counts,
+        # silently serving the wrong cached report.
+        if orjson is not None:
+            payload = orjson.dumps(analysis_data, default=str,
+                                   option=orjson.OPT_SORT_KEYS)
+        else:
+            payload = json.dumps(analysis_data, sort_keys=True, default=str).encode('utf-8')
+
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    async def _build_report_for_data(self, analysis_data: Dict[str, Any]) -> Report:
+        """Build a report for specific analysis data."""
+        # Take the clock once; every timestamp in the report (id, title,
+        # metadata, template date) is derived from it, so they agree even
+        # when generation straddles a second boundary
+        now = datetime.now()
+        report_id = f"report_{now.strftime('%Y%m%d_%H%M%S')}_{next(self._report_seq) % 10000:04d}"
+
+        # Organize the analysis once; every template-driven format reuses
+        # the same prepared data instead of rebuilding it per format. The
+        # per-file error grouping only feeds the HTML/Markdown templates,
+        # so JSON-only runs skip it entirely
+        formats = self.config.report.formats
+        needs_grouping = bool({'html', 'markdown'} & set(formats))
+        template_data = self._prepare_template_data(analysis_data, now=now,
+                                                    needs_grouping=needs_grouping)
+
+        # Generate all format contents concurrently; the generators are
+        # independent, so one slow or failing format never delays the rest
+        results = await asyncio.gather(
+            *(self._dispatch_format(format_type, analysis_data, template_data)
+              for format_type in formats),
+            return_exceptions=True
+        )
+
+        reports = {}
+        for format_type, result in zip(formats, results):
+            if isinstance(result, Exception):
+                logger.error("Error generating %s report: %s", format_type, result)
+                reports[format_type] = f"Error generating {format_type} report: {str(result)}"
+            else:
+                reports[format_type] = result
+        
+        # Use the first format as the primary report
+        primary_format = self.config.report.formats[0] if self.config.report.formats else 'html'
+        primary_content = reports.get(primary_format, "")
+        
+        # Create report metadata
+        metadata = {
+            'analysis_timestamp': now.isoformat(),
+            'error_count': len(analysis_data.get('error_context', [])),
+            'patterns_found': len(analysis_data.get('common_patterns', {})),
+            'fixes_suggested': len(analysis_data.get('suggested_fixes', [])),
+            'formats_generated': list(reports.keys())
+        }
+        
+        # Create report object
+        report = Report(
+            report_id=report_id,
+            title=f"Error Analysis Report - {now.strftime('%Y-%m-%d %H:%M:%S')}",
+            format=primary_format,
+            content=primary_content,
+            created_at=now,
+            metadata=metadata
+        )
+        
+        # Save report to file
+        await self._save_report_to_file(report, reports)
+        
+        return report
+    
+    async def _dispatch_format(self, format_type: str, analysis_data: Dict[str, Any],
+                               template_data: Dict[str, Any]) -> str:
+        """Route a format name to its generator coroutine."""
+        if format_type == 'html':
+            return await self._generate_html_report(template_data)
+        if format_type == 'markdown':
+            return await self._generate_markdown_report(template_data)
+        if format_type == 'json':
+            return await self._generate_json_report(analysis_data)
+        return f"Unsupported format: {format_type}"
+
+    async def _generate_html_report(self, template_data: Dict[str, Any]) -> str:
+        """Generate an HTML report from prepared template data."""
+        template = self.template_env.get_template('report_template.html')
+
+        # Render HTML
+        return template.render(**template_data)
+
+    async def _generate_markdown_report(self, template_data: Dict[str, Any]) -> str:
+        """Generate a Markdown report from prepared template data."""
+        template = self.template_env.get_template('report_template.md')
+
+        # Render Markdown
+        markdown_content = template.render(**template_data)
+        
+        # Convert to HTML if needed
+        if self.config.report.enable_detailed:
+            converter = self._markdown_converter()
+            converter.reset()
+            return converter.convert(markdown_content)
+
+        return markdown_content
+
+    def _markdown_converter(self) -> markdown.Markdown:
+        """Return the calling thread's reusable Markdown converter."""
+        converter = getattr(self._md_local, 'converter', None)
+        if converter is None:
+            converter = self._md_local.converter = markdown.Markdown(
+                extensions=['tables', 'fenced_code'])
+        return converter
+    
+    async def _generate_json_report(self, analysis_data: Dict[str, Any]) -> str:
+        """Generate a JSON report."""
+        # Add metadata and formatting
+        report_data = {
+            'report_metadata': {
+                'generated_at': datetime.now().isoformat(),
+                'version': self.config.system.version,
+                'analysis_data': analysis_data
+            }
+        }
+        
+        return _json_dumps_pretty(report_data).decode('utf-8')
+    
+    def _prepare_template_data(self, analysis_data: Dict[str, Any],
+                               now: Optional[datetime] = None,
+                               needs_grouping: bool = True) -> Dict[str, Any]:
+        """Prepare data for template rendering."""
+        if now is None:
+            now = datetime.now()
+        # Extract and organize data
+        error_context = analysis_data.get('error_context', [])
+        common_patterns = analysis_data.get('common_patterns', {})
+        suggested_fixes = analysis_data.get('suggested_fixes', [])
+        dependency_graph = analysis_data.get('dependency_graph', {})
+        risk_assessment = analysis_data.get('risk_assessment', {})
+        
+        # Organize error context by file, escaping each text field once
+        # here instead of on every render; Markup values pass through the
+        # autoescaping templates untouched. Only the HTML/Markdown
+        # templates read this, so callers emitting neither skip the pass
+        errors_by_file = defaultdict(list)
+        get_file_path = attrgetter('file_path')
+        for context in error_context if needs_grouping else ():
+            # Contexts are homogeneous dataclasses from the analyzer;
+            # assume the attribute and let the rare stray entry cost the
+            # exception instead of paying hasattr's probe on every item
+            try:
+                file_path = get_file_path(context)
+            except AttributeError:
+                continue
+            errors_by_file[file_path].append({
+                'line_number': getattr(context, 'line_number', None),
+                'function_name': Markup.escape(getattr(context, 'function_name', '') or ''),
+                'error_patterns': [Markup.escape(p)
+                                   for p in getattr(context, 'error_patterns', [])],
+                'code_snippet': Markup.escape(getattr(context, 'code_snippet', '') or '')
+            })
+        
+        # Calculate statistics (one pass over the risk levels instead of
+        # one scan per level)
+        risk_counts = Counter(risk_assessment.values())
+
+        # Pre-render the risk assessment section from the per-level
+        # fragments; the HTML template injects the joined Markup directly
+        risk_parts = []
+        for file_path, risk_level in risk_assessment.items():
+            fragment = _RISK_ITEM_FRAGMENTS.get(risk_level)
+            if fragment is None:
+                fragment = (_RISK_ITEM_TMPL
+                            .replace('{css}', str(risk_level).lower())
+                            .replace('{level}', html.escape(str(risk_level))))
+            risk_parts.append(fragment.replace('{path}', html.escape(str(file_path))))
+        risk_html = Markup(''.join(risk_parts))
+        stats = {
+            'total_errors': len(error_context),
+            'unique_files': len(errors_by_file),
+            'common_patterns_count': len(common_patterns),
+            'suggested_fixes_count': len(suggested_fixes),
+            'high_risk_files': risk_counts.get('HIGH', 0),
+            'medium_risk_files': risk_counts.get('MEDIUM', 0),
+            'low_risk_files': risk_counts.get('LOW', 0)
+        }
+        
+        # Prepare template data
+        template_data = {
+            'report_title': f"DevOps AI Error Analysis Report",
+            'report_date': now.strftime('%Y-%m-%d %H:%M:%S'),
+            'analysis_data': analysis_data,
+            'error_context': error_context,
+            'errors_by_file': dict(errors_by_file),
+            'common_patterns': common_patterns,
+            'suggested_fixes': suggested_fixes,
+            'dependency_graph': dependency_graph,
+            'risk_assessment': risk_assessment,
+            'risk_html': risk_html,
+            'statistics': stats,
+            'config': {
+                'enable_detailed': self.config.report.enable_detailed,
+                'enable_trends': self.config.report.enable_trends
+            }
+        }
+        
+        return template_data
+    
+    async def _save_report_to_file(self, report: Report, all_formats: Dict[str, str]):
+        """Save report to file in all formats."""
+        try:
+            # Shard by creation date so retention and stats scan days, not
+            # the whole flat history
+            shard_dir = os.path.join(self.config.report.output_dir,
+                                     report.created_at.strftime('%Y/%m/%d'))
+            report.metadata['path'] = shard_dir
+            primary_filepath = os.path.join(shard_dir, f"{report.report_id}.{report.format}")
+
+            # Encode every payload to UTF-8 bytes once, then fan the writes
+            # out to worker threads; the event loop only waits on the batch
+            writes = [(primary_filepath, report.content.encode('utf-8'))]
+
+            for format_type, content in all_formats.items():
+                if format_type != report.format:
+                    writes.append(
+                        (os.path.join(shard_dir, f"{report.report_id}.{format_type}"),
+                         content.encode('utf-8'))
+                    )
+
+            writes.append(
+                (os.path.join(shard_dir, f"{report.report_id}_metadata.json"),
+                 _json_dumps_pretty(report.metadata))
+            )
+
+            await asyncio.to_thread(os.makedirs, shard_dir, exist_ok=True)
+            await asyncio.gather(
+                *(asyncio.to_thread(Path(path).write_bytes, payload)
+                  for path, payload in writes)
+            )
+
             logger.info(f"Saved report {report.report_id} to {primary_filepath}")
-            
+
         except Exception as e:
             logger.error(f"Error saving report {report.report_id}: {e}")
     
@@ -499,77 +660,55 @@ class ReportBuilder:
     
     def _get_trend_html_template(self) -> Template:
         """Get trend analysis HTML template."""
-        trend_template = """
-<!DOCTYPE html>
-<html>
-<head>
-    <title>{{ report_title }}</title>
-    <style>
-        body { font-family: Arial, sans-serif; margin: 40px; }
-        .header { background: #f4f4f4; padding: 20px; border-radius: 5px; }
-        .chart-container { margin: 20px 0; }
-        .metric-card { background: #fff; border: 1px solid #ddd; padding: 15px; margin: 10px 0; border-radius: 5px; }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>{{ report_title }}</h1>
-        <p>Generated on: {{ report_date }}</p>
-    </div>
-    
-    <div class="chart-container">
-        <h2>Error Trends (Last {{ trend_data.time_range_days }} Days)</h2>
-        <!-- In a real implementation, you would use a charting library like Chart.js -->
-        <p>Note: Charts would be rendered here using actual charting libraries.</p>
-    </div>
-    
-    <div class="metric-card">
-        <h3>Fix Success Rates</h3>
-        <ul>
-        {% for error_type, success_rate in trend_data.fix_success_rates.items() %}
-            <li><strong>{{ error_type }}:</strong> {{ (success_rate * 100)|round(1) }}%</li>
-        {% endfor %}
-        </ul>
-    </div>
-    
-    <div class="metric-card">
-        <h3>Most Common Error Patterns</h3>
-        <ol>
-        {% for pattern in trend_data.most_common_patterns %}
-            <li>{{ pattern }}</li>
-        {% endfor %}
-        </ol>
-    </div>
-</body>
-</html>
-        """
-        return Template(trend_template)
+        return self._tpl_trend
     
     def _add_to_cache(self, key: str, report: Report):
         """Add report to cache."""
         if len(self._report_cache) >= self._cache_size:
-            # Remove oldest entries
-            oldest_key = next(iter(self._report_cache))
-            del self._report_cache[oldest_key]
-        
+            # Evict the least recently used entry
+            self._report_cache.popitem(last=False)
+
         self._report_cache[key] = report
     
     async def batch_generate_reports(self, analysis_data_list: List[Dict[str, Any]]) -> List[Report]:
         """Generate reports for multiple analysis datasets efficiently."""
-        tasks = [self.build_report(data) for data in analysis_data_list]
-        return await asyncio.gather(*tasks)
+        # Bound the fan-out: an unbounded gather over thousands of
+        # datasets would hold every render and file handle live at once
+        limit = (getattr(self.config.report, 'concurrency', None)
+                 or min(32, (os.cpu_count() or 1) * 4))
+        semaphore = asyncio.Semaphore(limit)
+
+        async def _bounded(data: Dict[str, Any]) -> Report:
+            async with semaphore:
+                return await self.build_report(data)
+
+        return await asyncio.gather(*(_bounded(data) for data in analysis_data_list))
     
+    def _iter_report_files(self, root: str):
+        """Yield DirEntry objects for report files under root, recursing
+        into date shards and skipping the template bytecode cache."""
+        try:
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name != '.jinja_cache':
+                            yield from self._iter_report_files(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+        except FileNotFoundError:
+            return
+
     def get_report_stats(self) -> Dict[str, Any]:
         """Get statistics about report generation."""
         report_files = []
         total_size = 0
-        
+
         try:
-            for filename in os.listdir(self.config.report.output_dir):
-                filepath = os.path.join(self.config.report.output_dir, filename)
-                if os.path.isfile(filepath):
-                    report_files.append(filename)
-                    total_size += os.path.getsize(filepath)
+            # scandir yields cached stat results, one syscall per entry
+            # instead of the listdir + isfile + getsize triple
+            for entry in self._iter_report_files(self.config.report.output_dir):
+                report_files.append(entry.name)
+                total_size += entry.stat(follow_symlinks=False).st_size
         except Exception as e:
             logger.warning(f"Error getting report stats: {e}")
         
@@ -589,23 +728,75 @@ class ReportBuilder:
         """Clear the report cache."""
         self._report_cache.clear()
         logger.info("Cleared report cache")
+
+    def clear_template_cache(self):
+        """Drop compiled templates, in memory and on disk."""
+        try:
+            # With auto_reload off the environment never re-resolves a
+            # cached template, so the in-memory cache must go too
+            self.template_env.cache.clear()
+            for entry in os.scandir(self._template_cache_dir):
+                os.unlink(entry.path)
+            logger.info("Cleared template bytecode cache")
+        except Exception as e:
+            logger.warning(f"Error clearing template cache: {e}")
     
     def cleanup_old_reports(self, days_to_keep: int = 30):
         """Clean up old report files."""
         try:
-            cutoff_time = datetime.now().timestamp() - (days_to_keep * 24 * 3600)
-            
+            cutoff = datetime.now() - timedelta(days=days_to_keep)
+
             removed_count = 0
-            for filename in os.listdir(self.config.report.output_dir):
-                filepath = os.path.join(self.config.report.output_dir, filename)
-                if os.path.getctime(filepath) < cutoff_time:
-                    os.remove(filepath)
-                    removed_count += 1
+            with os.scandir(self.config.report.output_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name != '.jinja_cache':
+                            removed_count += self._cleanup_year_shard(entry, cutoff.date())
+                    elif entry.is_file(follow_symlinks=False):
+                        # Legacy flat files from before the sharded layout
+                        if entry.stat(follow_symlinks=False).st_ctime < cutoff.timestamp():
+                            os.remove(entry.path)
+                            removed_count += 1
             
             logger.info(f"Cleaned up {removed_count} old report files")
-            
+
         except Exception as e:
             logger.error(f"Error cleaning up old reports: {e}")
+
+    def _cleanup_year_shard(self, year_entry: os.DirEntry, cutoff_date) -> int:
+        """Drop whole day shards older than cutoff_date under one year
+        directory; returns the number of files removed."""
+        removed = 0
+        with os.scandir(year_entry.path) as months:
+            for month_entry in months:
+                if not month_entry.is_dir(follow_symlinks=False):
+                    continue
+                with os.scandir(month_entry.path) as days:
+                    for day_entry in days:
+                        if not day_entry.is_dir(follow_symlinks=False):
+                            continue
+                        try:
+                            shard_date = datetime.strptime(
+                                f"{year_entry.name}-{month_entry.name}-{day_entry.name}",
+                                '%Y-%m-%d'
+                            ).date()
+                        except ValueError:
+                            continue
+                        if shard_date < cutoff_date:
+                            with os.scandir(day_entry.path) as files:
+                                removed += sum(1 for f in files
+                                               if f.is_file(follow_symlinks=False))
+                            shutil.rmtree(day_entry.path, ignore_errors=True)
+                # Prune month directories emptied by shard removal
+                try:
+                    os.rmdir(month_entry.path)
+                except OSError:
+                    pass
+        try:
+            os.rmdir(year_entry.path)
+        except OSError:
+            pass
+        return removed
     
     def create_custom_template(self, template_name: str, template_content: str):
         """Create a custom report template."""
@@ -613,7 +804,12 @@ class ReportBuilder:
             template_path = os.path.join(self.config.report.template_dir, template_name)
             with open(template_path, 'w') as f:
                 f.write(template_content)
-            
+
+            # Evict compiled templates so the next render resolves the new
+            # file; auto_reload is off, so a stale cache entry would pin
+            # the old template for the life of the process
+            self.template_env.cache.clear()
+
             logger.info(f"Created custom template: {template_name}")
             
         except Exception as e:
@@ -5,22 +5,52 @@ Uses efficient file watching and real-time log processing.
 """
 
 import asyncio
+import datetime
+import json
 import logging
 import os
 import re
 import time
+from collections import deque
 from pathlib import Path
-from typing import List, Dict, Any, AsyncGenerator, Optional
+from typing import List, Dict, Any, AsyncGenerator, Optional, Tuple
 from dataclasses import dataclass
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Local binding skips the module attribute lookup on the per-line path
+_now = time.time
+
+
+def _literal_core(pattern: str) -> Optional[str]:
+    """Return the literal core of a ``.*LITERAL.*`` style pattern, or
+    None when the pattern uses real regex syntax."""
+    core = pattern
+    while core.startswith('.*'):
+        core = core[2:]
+    while core.endswith('.*'):
+        core = core[:-2]
+    if core and re.escape(core) == core:
+        return core
+    return None
 
-@dataclass
+
+@dataclass(slots=True)
 class LogEntry:
     """Represents a single log entry."""
     timestamp: float
@@ -46,9 +76,13 @@ class LogFileHandler(FileSystemEventHandler):
         """Handle file modification events."""
         if event.is_directory:
             return
-        
+
+        # Scan files we already track, plus anything log-shaped appearing
+        # in a watched directory. log_patterns are message regexes and
+        # must not be used to filter paths — they never substring-match
+        # a filename, which would suppress every event.
         file_path = event.src_path
-        if any(pattern in file_path for pattern in self.log_watcher.config.log.log_patterns):
+        if file_path in self.log_watcher.file_positions or file_path.endswith('.log'):
             self.log_watcher._schedule_file_scan(file_path)
 
 
@@ -58,13 +92,78 @@ class LogWatcher:
     def __init__(self, config: Config):
         self.config = config
         self.running = False
-        self.entries = []
-        self.observers = []
+        # Bounded buffer: append is O(1) and the oldest entry falls off
+        # automatically, unlike list.pop(0)'s O(n) memmove
+        self.entries = deque(maxlen=config.log.max_entries)
+        # One observer thread serves every watched path; per-path
+        # observers would each spawn their own dispatch thread
+        self._observer = Observer()
+        self._watched_dirs = set()
         self.file_positions = {}
         self.file_handlers = {}
+        # Partial trailing line per file, carried between chunked reads so
+        # a line split across two reads is stitched back together
+        self._line_tail: Dict[str, bytes] = {}
+        # Long-lived descriptor per tailed file: steady-state polling is
+        # one pread syscall instead of an open/seek/read/close quartet
+        self._fd_cache: Dict[str, int] = {}
+
+        # One combined line pattern, compiled once: the standard and
+        # syslog formats live in a single alternation with named groups,
+        # so each line costs one match instead of a cascade of regexes
+        self._line_re = re.compile(
+            # Standard format: [timestamp] LEVEL: message
+            r'(?:\[(?P<ts1>[^\]]*)\]\s*(?P<lvl1>\w+):\s*(?P<msg1>.*))'
+            # Syslog format: timestamp hostname app: message
+            r'|(?:(?P<ts2>\w+\s+\d+\s+\d+:\d+:\d+)\s+\S+\s+\S+:\s*(?P<msg2>.*))',
+            re.IGNORECASE
+        )
+        # Level keyword lookup for otherwise unstructured lines; replaces
+        # the old backtracking-heavy (.*?)(LEVEL)(.*?)(.*) pattern
+        self._level_re = re.compile(
+            r'\b(ERROR|WARN|INFO|DEBUG|FATAL|CRITICAL)\b', re.IGNORECASE
+        )
+        # Prebound bound methods: each saves an attribute lookup on every
+        # parsed line
+        self._match_line = self._line_re.match
+        self._search_level = self._level_re.search
+        self._compiled_error_patterns = [
+            re.compile(pattern, re.IGNORECASE)
+            for pattern in config.log.log_patterns
+        ]
+        # When every configured pattern is just a literal wrapped in .*,
+        # one Aho-Corasick pass over the message replaces the per-pattern
+        # regex loop; any genuinely regex-shaped pattern disables this
+        literals = [_literal_core(p) for p in config.log.log_patterns]
+        self._error_automaton = None
+        if ahocorasick is not None and literals and all(literals):
+            automaton = ahocorasick.Automaton()
+            for literal in literals:
+                automaton.add_word(literal.lower(), literal)
+            automaton.make_automaton()
+            self._error_automaton = automaton
+        # Remembers which strptime format each source file uses; logs in
+        # one file share a format, so steady state is one parse per line
+        self._format_cache: Dict[str, str] = {}
+        # Cheap substring prefilter derived from the configured patterns:
+        # every match of a .*LITERAL.* pattern necessarily contains its
+        # literal core, so a C-level `in` scan for the cores can reject
+        # most lines before the regex loop. Any pattern without a literal
+        # core disables the prefilter — a fixed keyword list there would
+        # silently drop matches of custom patterns.
+        if literals and all(literals):
+            self._error_keywords = tuple({literal.lower() for literal in literals})
+        else:
+            self._error_keywords = None
         
         # Async queue for new log entries
         self.entry_queue = asyncio.Queue()
+
+        # Paths with pending writes, fed by watchdog events; the set
+        # coalesces bursts of writes to one queued scan per file
+        self._dirty_queue = asyncio.Queue()
+        self._dirty_set = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         
         # Setup file system monitoring
         self._setup_file_monitoring()
@@ -81,35 +180,44 @@ class LogWatcher:
         """Add a specific log file to monitoring."""
         if file_path in self.file_positions:
             return
-        
-        # Initialize file position
-        self.file_positions[file_path] = 0
-        
-        # Setup file system observer
-        observer = Observer()
-        handler = LogFileHandler(self)
-        observer.schedule(handler, os.path.dirname(file_path), recursive=False)
-        observer.start()
-        self.observers.append(observer)
-        
+
+        # Start tailing from the current end of the file: ingesting a
+        # large rotated history on startup would be O(file size) of parse
+        # work for entries that already had their chance to be handled
+        try:
+            self.file_positions[file_path] = os.path.getsize(file_path)
+        except OSError:
+            self.file_positions[file_path] = 0
+
+        # Register the parent directory on the shared observer
+        self._watch_directory(os.path.dirname(file_path), recursive=False)
+
         logger.info(f"Started monitoring log file: {file_path}")
-    
+
     def _add_log_directory(self, dir_path: str):
         """Add a directory to monitor for log files."""
         # Monitor directory for new log files
-        observer = Observer()
-        handler = LogFileHandler(self)
-        observer.schedule(handler, dir_path, recursive=True)
-        observer.start()
-        self.observers.append(observer)
-        
+        self._watch_directory(dir_path, recursive=True)
+
         logger.info(f"Started monitoring log directory: {dir_path}")
+
+    def _watch_directory(self, dir_path: str, recursive: bool):
+        """Schedule a directory on the shared observer, once."""
+        if dir_path in self._watched_dirs:
+            return
+        self._watched_dirs.add(dir_path)
+        self._observer.schedule(LogFileHandler(self), dir_path, recursive=recursive)
     
     async def start(self):
         """Start the log watcher."""
         logger.info("Starting log watcher...")
         self.running = True
-        
+        self._loop = asyncio.get_running_loop()
+
+        # One dispatch thread covers all scheduled watches
+        if not self._observer.is_alive():
+            self._observer.start()
+
         # Start background tasks
         asyncio.create_task(self._scan_files_loop())
         asyncio.create_task(self._cleanup_loop())
@@ -119,167 +227,240 @@ class LogWatcher:
         logger.info("Stopping log watcher...")
         self.running = False
         
-        # Stop all observers
-        for observer in self.observers:
-            observer.stop()
-        
-        # Wait for observers to stop
-        for observer in self.observers:
-            observer.join()
+        # Stop the shared observer and wait for its thread
+        if self._observer.is_alive():
+            self._observer.stop()
+            self._observer.join()
+
+        # Release tailing descriptors
+        for file_path in list(self._fd_cache):
+            self._close_cached_fd(file_path)
     
     def _schedule_file_scan(self, file_path: str):
-        """Schedule a file scan for the given file path."""
-        # This will be picked up by the scan loop
+        """Schedule a file scan for the given path.
+
+        Called from watchdog's dispatch thread, so the handoff to the
+        event loop goes through call_soon_threadsafe."""
         if file_path not in self.file_positions:
             self.file_positions[file_path] = 0
-    
+
+        loop = self._loop
+        if loop is not None and self.running:
+            loop.call_soon_threadsafe(self._mark_dirty, file_path)
+
+    def _mark_dirty(self, file_path: str):
+        """Queue a path for scanning unless a scan is already pending."""
+        if file_path not in self._dirty_set:
+            self._dirty_set.add(file_path)
+            self._dirty_queue.put_nowait(file_path)
+
     async def _scan_files_loop(self):
-        """Main loop for scanning log files."""
+        """Main loop for scanning log files.
+
+        Scans are driven by watchdog modification events at kernel-event
+        latency; the poll interval only bounds how long a write missed by
+        the watcher (e.g. on unmonitored mounts) can go unseen."""
         while self.running:
             try:
-                await self._scan_all_files()
-                await asyncio.sleep(self.config.log.poll_interval)
+                try:
+                    file_path = await asyncio.wait_for(
+                        self._dirty_queue.get(),
+                        timeout=self.config.log.poll_interval
+                    )
+                except asyncio.TimeoutError:
+                    # Safety net for files without events
+                    await self._scan_all_files()
+                    continue
+
+                self._dirty_set.discard(file_path)
+                await self._scan_file(file_path)
             except Exception as e:
                 logger.error(f"Error in scan loop: {e}")
                 await asyncio.sleep(1)  # Prevent rapid error loops
     
     async def _scan_all_files(self):
         """Scan all monitored files for new entries."""
-        for file_path in list(self.file_positions.keys()):
-            try:
-                await self._scan_file(file_path)
-            except Exception as e:
-                logger.error(f"Error scanning file {file_path}: {e}")
+        # Independent files overlap their disk waits instead of queueing
+        file_paths = list(self.file_positions.keys())
+        results = await asyncio.gather(
+            *(self._scan_file(file_path) for file_path in file_paths),
+            return_exceptions=True
+        )
+        for file_path, result in zip(file_paths, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error scanning file {file_path}: {result}")
     
     async def _scan_file(self, file_path: str):
         """Scan a specific file for new log entries."""
-        if not os.path.exists(file_path):
+        try:
+            size = os.stat(file_path).st_size
+        except OSError:
             # File was deleted or moved
             if file_path in self.file_positions:
                 del self.file_positions[file_path]
+            self._line_tail.pop(file_path, None)
+            self._close_cached_fd(file_path)
             return
-        
+
+        position = self.file_positions.get(file_path, 0)
+        if size == position:
+            # Nothing appended since the last scan — the common case
+            # between polls; one stat replaces the whole read cycle
+            return
+        if size < position:
+            # Log rotation or truncation: start over from the top
+            position = self.file_positions[file_path] = 0
+            self._line_tail.pop(file_path, None)
+            self._close_cached_fd(file_path)
+
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                # Seek to last known position
-                f.seek(self.file_positions[file_path])
-                
-                # Read new content
-                new_content = f.read(self.config.log.buffer_size)
-                
-                if new_content:
-                    # Process new lines
-                    lines = new_content.split('\n')
-                    
-                    for line in lines:
-                        if line.strip():
-                            entry = self._parse_log_line(line, file_path)
-                            if entry:
-                                await self._process_log_entry(entry)
-                
-                # Update file position
-                self.file_positions[file_path] = f.tell()
-                
+            # The blocking read runs in a worker thread so the event loop
+            # keeps servicing other files and the queue
+            chunk, new_position = await asyncio.to_thread(
+                self._read_new_bytes, file_path, position
+            )
+
+            if chunk:
+                data = self._line_tail.pop(file_path, b'') + chunk
+                lines = data.split(b'\n')
+                # The final piece may be an incomplete line; keep it
+                # for the next read instead of parsing a fragment
+                tail = lines.pop()
+                if tail:
+                    self._line_tail[file_path] = tail
+
+                for raw_line in lines:
+                    # isspace on the raw bytes skips blank lines without
+                    # allocating the stripped copy str.strip would make,
+                    # and without decoding them at all
+                    if not raw_line or raw_line.isspace():
+                        continue
+                    if raw_line.endswith(b'\r'):
+                        raw_line = raw_line[:-1]
+                    line = raw_line.decode('utf-8', 'ignore')
+                    entry = self._parse_log_line(line, file_path)
+                    if entry:
+                        await self._process_log_entry(entry)
+
+            # Update file position
+            self.file_positions[file_path] = new_position
+
         except Exception as e:
             logger.error(f"Error reading file {file_path}: {e}")
+
+    def _read_new_bytes(self, file_path: str, position: int) -> Tuple[bytes, int]:
+        """Blocking helper: read up to buffer_size new bytes from position.
+
+        Returns the chunk and the file position after the read."""
+        # Binary reads skip the TextIOWrapper decode path; lines are
+        # decoded individually only after splitting on raw newlines
+        if hasattr(os, 'pread'):
+            fd = self._fd_cache.get(file_path)
+            if fd is None:
+                fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0))
+                self._fd_cache[file_path] = fd
+            chunk = os.pread(fd, self.config.log.buffer_size, position)
+            return chunk, position + len(chunk)
+
+        with open(file_path, 'rb') as f:
+            f.seek(position)
+            chunk = f.read(self.config.log.buffer_size)
+            return chunk, f.tell()
+
+    def _close_cached_fd(self, file_path: str):
+        """Close and forget the cached descriptor for a file, if any."""
+        fd = self._fd_cache.pop(file_path, None)
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
     
     def _parse_log_line(self, line: str, source: str) -> Optional[LogEntry]:
         """Parse a single log line into a LogEntry object."""
-        # Basic log line patterns
-        patterns = [
-            # Standard format: [timestamp] LEVEL: message
-            r'\[(.*?)\]\s*(\w+):\s*(.*)',
-            # Syslog format: timestamp hostname app: message
-            r'(\w+\s+\d+\s+\d+:\d+:\d+)\s+(\S+)\s+(\S+):\s*(.*)',
-            # JSON format
-            r'(\{.*\})',
-            # Generic format
-            r'(.*?)(ERROR|WARN|INFO|DEBUG|FATAL|CRITICAL)(.*?)(.*)'
-        ]
-        
-        for pattern in patterns:
-            match = re.match(pattern, line, re.IGNORECASE)
-            if match:
-                if pattern.startswith(r'(\{.*\})'):
-                    # JSON format
-                    try:
-                        import json
-                        data = json.loads(match.group(1))
-                        return LogEntry(
-                            timestamp=time.time(),
-                            level=data.get('level', 'INFO'),
-                            message=data.get('message', ''),
-                            source=source,
-                            raw_line=line,
-                            metadata=data
-                        )
-                    except:
-                        continue
-                else:
-                    # Regular expression format
-                    groups = match.groups()
-                    if len(groups) >= 3:
-                        timestamp = groups[0] if groups[0] else time.time()
-                        level = groups[1] if groups[1] else 'INFO'
-                        message = groups[2] if groups[2] else line
-                        
-                        return LogEntry(
-                            timestamp=self._parse_timestamp(timestamp),
-                            level=level.upper(),
-                            message=message,
-                            source=source,
-                            raw_line=line
-                        )
-        
-        # If no pattern matches, treat as generic log entry
+        # JSON lines are recognized with a cheap prefix check; no regex
+        # ever runs for structured logs
+        stripped = line.lstrip()
+        if stripped.startswith('{'):
+            try:
+                data = _json_loads(stripped)
+                return LogEntry(
+                    timestamp=_now(),
+                    level=data.get('level', 'INFO'),
+                    message=data.get('message', ''),
+                    source=source,
+                    raw_line=line,
+                    metadata=data
+                )
+            except (ValueError, TypeError):
+                # Not valid JSON after all; fall through to line patterns
+                pass
+
+        match = self._match_line(line)
+        if match:
+            if match.group('lvl1') is not None:
+                timestamp, level, message = match.group('ts1', 'lvl1', 'msg1')
+            else:
+                timestamp, message = match.group('ts2', 'msg2')
+                level = 'INFO'
+
+            return LogEntry(
+                timestamp=self._parse_timestamp(timestamp, source) if timestamp else _now(),
+                level=level.upper(),
+                message=message if message else line,
+                source=source,
+                raw_line=line
+            )
+
+        # Unstructured line: salvage a level keyword if one is present
+        level_match = self._search_level(line)
         return LogEntry(
-            timestamp=time.time(),
-            level='INFO',
+            timestamp=_now(),
+            level=level_match.group(1).upper() if level_match else 'INFO',
             message=line,
             source=source,
             raw_line=line
         )
     
-    def _parse_timestamp(self, timestamp_str: str) -> float:
+    def _parse_timestamp(self, timestamp_str: str, source: str = '') -> float:
         """Parse timestamp string to float."""
-        try:
-            # Try various timestamp formats
-            import datetime
-            
-            # Common formats
-            formats = [
-                '%Y-%m-%d %H:%M:%S',
-                '%Y-%m-%d %H:%M:%S.%f',
-                '%Y/%m/%d %H:%M:%S',
-                '%Y/%m/%d %H:%M:%S.%f',
-                '%b %d %H:%M:%S',
-                '%b %d %H:%M:%S %Y'
-            ]
-            
-            for fmt in formats:
-                try:
-                    dt = datetime.datetime.strptime(timestamp_str, fmt)
-                    return dt.timestamp()
-                except ValueError:
-                    continue
-            
-            # If all formats fail, return current time
-            return time.time()
-            
-        except:
-            return time.time()
+        # Try the format that last worked for this source first; on a
+        # hit this is the only strptime call for the line
+        cached_fmt = self._format_cache.get(source)
+        if cached_fmt:
+            try:
+                return datetime.datetime.strptime(timestamp_str, cached_fmt).timestamp()
+            except ValueError:
+                pass
+
+        # Common formats
+        formats = [
+            '%Y-%m-%d %H:%M:%S',
+            '%Y-%m-%d %H:%M:%S.%f',
+            '%Y/%m/%d %H:%M:%S',
+            '%Y/%m/%d %H:%M:%S.%f',
+            '%b %d %H:%M:%S',
+            '%b %d %H:%M:%S %Y'
+        ]
+
+        for fmt in formats:
+            try:
+                dt = datetime.datetime.strptime(timestamp_str, fmt)
+                self._format_cache[source] = fmt
+                return dt.timestamp()
+            except ValueError:
+                continue
+
+        # If all formats fail, return current time
+        return _now()
     
     async def _process_log_entry(self, entry: LogEntry):
         """Process a log entry and add it to the queue."""
         # Check if entry matches error patterns
         if self._is_error_entry(entry):
-            # Add to entries list
+            # Add to entries buffer; the deque enforces max_entries itself
             self.entries.append(entry)
-            
-            # Maintain max entries limit
-            if len(self.entries) > self.config.log.max_entries:
-                self.entries.pop(0)
-            
+
             # Add to queue for processing
             await self.entry_queue.put(entry)
             
@@ -292,26 +473,55 @@ class LogWatcher:
         if entry.level.upper() in error_levels:
             return True
         
-        # Check message content against patterns
         message_lower = entry.message.lower()
-        for pattern in self.config.log.log_patterns:
-            if re.search(pattern, message_lower, re.IGNORECASE):
+
+        # All patterns are literals: match them in one automaton pass
+        if self._error_automaton is not None:
+            for _ in self._error_automaton.iter(message_lower):
+                return True
+            return False
+
+        # Skip the regex loop entirely when no pattern's literal core
+        # appears in the message (the common case for healthy logs)
+        if self._error_keywords is not None and not any(
+                keyword in message_lower for keyword in self._error_keywords):
+            return False
+
+        # Check message content against patterns
+        for pattern in self._compiled_error_patterns:
+            if pattern.search(entry.message):
                 return True
         
         return False
     
-    async def get_new_entries(self) -> List[LogEntry]:
-        """Get new log entries from the queue."""
+    async def get_new_entries(self, max_n: int = 1024,
+                              timeout: Optional[float] = None) -> List[LogEntry]:
+        """Get new log entries from the queue in one batch.
+
+        Waits up to ``timeout`` seconds for the first entry (``None``
+        waits indefinitely, ``0`` returns immediately), then drains up to
+        ``max_n`` entries without further awaiting, so the consumer pays
+        one event-loop wakeup per batch instead of per entry."""
         entries = []
-        
-        # Get all available entries from queue
-        while not self.entry_queue.empty():
+
+        try:
+            if timeout == 0:
+                entries.append(self.entry_queue.get_nowait())
+            elif timeout is None:
+                entries.append(await self.entry_queue.get())
+            else:
+                entries.append(
+                    await asyncio.wait_for(self.entry_queue.get(), timeout)
+                )
+        except (asyncio.QueueEmpty, asyncio.TimeoutError):
+            return entries
+
+        while len(entries) < max_n:
             try:
-                entry = self.entry_queue.get_nowait()
-                entries.append(entry)
+                entries.append(self.entry_queue.get_nowait())
             except asyncio.QueueEmpty:
                 break
-        
+
         return entries
     
     async def _cleanup_loop(self):
@@ -322,10 +532,12 @@ class LogWatcher:
                 current_time = time.time()
                 cutoff_time = current_time - (86400 * 7)  # Keep 7 days
                 
-                self.entries = [
-                    entry for entry in self.entries
-                    if entry.timestamp > cutoff_time
-                ]
+                # Entries arrive in near-chronological order, so expiry
+                # only ever trims a prefix: pop from the left until the
+                # head is fresh instead of rescanning the whole buffer
+                entries = self.entries
+                while entries and entries[0].timestamp <= cutoff_time:
+                    entries.popleft()
                 
                 await asyncio.sleep(3600)  # Run every hour
             except Exception as e: